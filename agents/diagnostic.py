@@ -6,7 +6,7 @@ from pydantic import BaseModel, Field
 
 from core.state import AgentState
 from config.prompts import DIAGNOTIC_PROMPT, ANSWER_EVALUATION_PROMPT
-from tools.llm import LLM
+from tools.llm import get_llm
 from utils.log_utils import logger
 
 
@@ -85,7 +85,7 @@ def evaluate_answer_quality(question: str, user_answer: str, expected_level: flo
     Returns:
         Dictionary with quality_score, reasoning, strengths, weaknesses, level_indication
     """
-    llm = LLM()
+    llm = get_llm()
     parser = AnswerEvaluationParser(pydantic_object=AnswerEvaluation)
     
     try:
@@ -108,6 +108,8 @@ def evaluate_answer_quality(question: str, user_answer: str, expected_level: flo
                 "level_indication": "unknown"
             }
         
+        llm.commit(evaluation_response)
+        
         evaluation_data = {
             "quality_score": evaluation_obj.quality_score,
             "reasoning": evaluation_obj.reasoning,
@@ -200,12 +202,12 @@ def adaptive_diagnostic_node(state: AgentState):
 
     logger.info(f"Adaptive diagnostic node called with state")
 
-    confidence = state.get("diagnostic_confidence", 0.0)
-    questions = state.get("diagnostic_questions", [])
-    answers = state.get("diagnostic_answers", [])
-    estimated_level = state.get("estimated_level", 0.2)
+    confidence = state.diagnostic_confidence
+    questions = state.diagnostic_questions
+    answers = state.diagnostic_answers
+    estimated_level = state.estimated_level
 
-    topic = state["topic"]
+    topic = state.topic
     
     num_questions = len(questions)
 
@@ -220,7 +222,7 @@ def adaptive_diagnostic_node(state: AgentState):
         )
 
         return {
-            "decision_log": state["decision_log"] + [decision],
+            "decision_log": [decision],
         }
 
 
@@ -229,12 +231,12 @@ def adaptive_diagnostic_node(state: AgentState):
         
         return {
             "diagnostic_confidence": MIN_DIAGNOSTIC_CONFIDENCE,
-            "decision_log": state.get("decision_log", []) + [decision]
+            "decision_log": [decision]
         }
     
     logger.info(f"Generating diagnostic question {num_questions + 1}")
     
-    llm = LLM()
+    llm = get_llm()
     parser = DiagnosticQuestionParser(pydantic_object=DiagnosticQuestion)
 
     qa_history = "\n".join([
@@ -263,6 +265,7 @@ def adaptive_diagnostic_node(state: AgentState):
             expected_level = estimated_level
             reasoning = "Fallback question due to parsing error"
         else:
+            llm.commit(diagnostic_response)
             next_question = diagnostic_question_obj.question
             expected_level = diagnostic_question_obj.expected_level
             reasoning = diagnostic_question_obj.reasoning
@@ -285,9 +288,8 @@ def adaptive_diagnostic_node(state: AgentState):
         expected_level = estimated_level
         reasoning = "Fallback question due to no valid question"
 
-    new_questions = questions + [next_question]
     user_answer = input(f"Answer the question: {next_question}")
-    new_answers = answers + [user_answer]
+    total_questions = num_questions + 1
     
     answer_evaluation = evaluate_answer_quality(
         question=next_question,
@@ -305,7 +307,7 @@ def adaptive_diagnostic_node(state: AgentState):
     new_estimated_level = max(0.0, min(1.0, estimated_level + level_adjustment))
     new_confidence = min(1.0, confidence + CONFIDENCE_INCREMENT)
     
-    decision = f"Q{len(new_questions)}: {next_question[:60]}..."
+    decision = f"Q{total_questions}: {next_question[:60]}..."
     if reasoning:
         decision += f" | Reasoning: {reasoning}"
     
@@ -314,17 +316,17 @@ def adaptive_diagnostic_node(state: AgentState):
     
     logger.info(f"\nState updates:")
     logger.info(f"  - New confidence: {new_confidence:.2f}")
-    logger.info(f"  - Total questions: {len(new_questions)}")
+    logger.info(f"  - Total questions: {total_questions}")
     logger.info(f"  - Level adjustment: {level_adjustment:+.3f}")
     logger.info(f"  - New estimated level: {new_estimated_level:.2f}")
     logger.info(f"  - Answer quality: {answer_evaluation['quality_score']:.2f}")
     
     updates = {
-        "diagnostic_questions": new_questions,
-        "diagnostic_answers": new_answers,
+        "diagnostic_questions": [next_question],
+        "diagnostic_answers": [user_answer],
         "diagnostic_confidence": new_confidence,
         "estimated_level": new_estimated_level,
-        "decision_log": state.get("decision_log", []) + [decision]
+        "decision_log": [decision]
     }
     
     return updates
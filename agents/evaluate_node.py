@@ -1,14 +1,14 @@
 from typing import Dict, Any
 from datetime import datetime
 
-from core.state import AgentState
-from config.parsers import parse_answer_evaluation, safe_parse
+from core.state import AgentState, LearningSession
+from config.parsers import parse_answer_evaluation, try_parse
 from agents.strategies import update_strategy_effectiveness, track_session_effectiveness
 from config.prompts import ANSWER_EVALUATION_PROMPT
 from tools.llm import get_llm
 
 
-def evaluate_node(state: AgentState) -> Dict[str, Any]:
+async def evaluate_node(state: AgentState) -> Dict[str, Any]:
     """
     Evaluate student answer using LLM-based grading.
     
@@ -33,16 +33,17 @@ def evaluate_node(state: AgentState) -> Dict[str, Any]:
     print("="*60)
     
     
-    strategy = state.get("current_strategy", "direct_explanation")
-    topic = state.get("topic", "Unknown Topic")
-    student_level = state.get("current_proficiency", 0.5)
-    question = state.get("current_question", "")
-    user_answer = state.get("current_user_answer", "")
-    correct_answer = state.get("current_correct_answer", "")
-    current_explanation = state.get("current_explanation", "")
-    teaching_data = state.get("current_teaching_data", {})
+    current = state.current
+    strategy = current.strategy or "direct_explanation"
+    topic = state.topic
+    student_level = state.current_proficiency
+    question = current.question
+    user_answer = current.user_answer
+    correct_answer = current.correct_answer
+    current_explanation = current.explanation
+    teaching_data = current.data
         
-    difficulty = state.get("current_question_difficulty", student_level)
+    difficulty = current.difficulty
     
     print(f"\nStrategy: {strategy}")
     print(f"Topic: {topic}")
@@ -67,27 +68,20 @@ def evaluate_node(state: AgentState) -> Dict[str, Any]:
         user_answer=user_answer
     )
     
-    llm = get_llm(use_mock=False)
-    response = llm.invoke(prompt)
-    
-    if hasattr(response, 'content'):
-        response_text = response.content
-    else:
-        response_text = str(response)
+    llm = get_llm()
+    response_text = await llm.ainvoke(prompt)
     
     print(f"LLM response received")
     
     print(f"\nParsing evaluation response...")
     
-    try:
-        evaluation = parse_answer_evaluation(response_text)
+    evaluation, parsed = try_parse(response_text, parse_answer_evaluation)
+    
+    if parsed:
         print(f"Successfully parsed evaluation response")
-        
-    except Exception as e:
-        print(f" Parse error: {e}")
+        llm.commit(response_text)
+    else:
         print(f"Using fallback evaluation")
-        
-        evaluation = safe_parse(response_text, parse_answer_evaluation)
     
     session_score = evaluation["quality_score"]
     
@@ -122,43 +116,44 @@ def evaluate_node(state: AgentState) -> Dict[str, Any]:
     print(f"   New Proficiency: {new_proficiency:.2f} (from {student_level:.2f})")
     
     
-    session_id = len(state.get("sessions", [])) + 1
+    session_id = len(state.sessions) + 1
     
     explanation = _extract_explanation_for_session(strategy, teaching_data, current_explanation)
     
-    session_record = {
-        "session_id": session_id,
-        "strategy": strategy,
-        "score": session_score,
-        "topic": topic,
-        "explanation": explanation,
-        "question": question,
-        "user_answer": user_answer,
-        "correct_answer": correct_answer,
-        "feedback": evaluation.get('reasoning', ''),
-        "timestamp": datetime.now().isoformat()
-    }
+    session_record = LearningSession(
+        session_id=session_id,
+        strategy=strategy,
+        score=session_score,
+        topic=topic,
+        explanation=explanation,
+        question=question,
+        user_answer=user_answer,
+        correct_answer=correct_answer,
+        feedback=evaluation.get('reasoning', ''),
+        timestamp=datetime.now().isoformat(),
+        student_level=student_level
+    )
     
     track_session_effectiveness(strategy, session_score, topic, student_level)
     
     updated_strategies = update_strategy_effectiveness(
-        state.get("available_strategies", []),
+        state.available_strategies,
         strategy,
         session_score
     )
     
-    strategy_obj = next((s for s in updated_strategies if s["name"] == strategy), None)
+    strategy_obj = next((s for s in updated_strategies if s.name == strategy), None)
     if strategy_obj:
         print(f"\nStrategy Effectiveness Update:")
-        print(f"   {strategy}: {strategy_obj['effectiveness']:.2f}")
+        print(f"   {strategy}: {strategy_obj.effectiveness:.2f}")
 
-    new_sessions = state.get("sessions", []) + [session_record]
-    
     is_success = session_score >= 0.6
-    consecutive_failures = 0 if is_success else state.get("consecutive_failures", 0) + 1
-    stuck_counter = 0 if is_success else state.get("stuck_counter", 0) + 1
+    # 1 on failure, 0 on success: failure counters grow or reset without branching
+    failed = int(not is_success)
+    consecutive_failures = (state.consecutive_failures + 1) * failed
+    stuck_counter = (state.stuck_counter + 1) * failed
     
-    current_attempt = state.get("current_attempt", 0) + 1
+    current_attempt = state.current_attempt + 1
     
     decision = (
         f"Evaluation: Score {session_score:.2f} | "
@@ -167,13 +162,14 @@ def evaluate_node(state: AgentState) -> Dict[str, Any]:
     )
     
     return {
-        "sessions": new_sessions,
+        "sessions": [session_record],
+        "strategy_running_stats": {strategy: (session_score, 1)},
         "available_strategies": updated_strategies,
         "current_proficiency": new_proficiency,
         "consecutive_failures": consecutive_failures,
         "stuck_counter": stuck_counter,
         "current_attempt": current_attempt,
-        "decision_log": state.get("decision_log", []) + [decision]
+        "decision_log": [decision]
     }
 
 
@@ -1,12 +1,12 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from core.state import AgentState
-from config.parsers import parse_meta_reasoner_decision, safe_parse
+from config.parsers import parse_meta_reasoner_decision, try_parse
 from config.prompts import META_REASONER_PROMPT
 from tools.llm import get_llm
 
 
-def meta_reasoner_node( state: AgentState) -> Dict[str, Any]:
+async def meta_reasoner_node( state: AgentState) -> Dict[str, Any]:
     """
     Analyze learning progress and decide next action.
     
@@ -34,15 +34,15 @@ def meta_reasoner_node( state: AgentState) -> Dict[str, Any]:
     print("Meta-Reasoner Node")
     print("="*60)
     
-    topic = state.get("topic", "Unknown Topic")
-    learning_goal = state.get("learning_goal", f"Master {topic}")
-    current_proficiency = state.get("current_proficiency", 0.0)
-    target_proficiency = state.get("target_proficiency", 0.8)
-    current_attempt = state.get("current_attempt", 0)
-    max_attempts = state.get("max_attempts", 10)
-    consecutive_failures = state.get("consecutive_failures", 0)
-    stuck_counter = state.get("stuck_counter", 0)
-    sessions = state.get("sessions", [])
+    topic = state.topic
+    learning_goal = state.learning_goal
+    current_proficiency = state.current_proficiency
+    target_proficiency = state.target_proficiency
+    current_attempt = state.current_attempt
+    max_attempts = state.max_attempts
+    consecutive_failures = state.consecutive_failures
+    stuck_counter = state.stuck_counter
+    sessions = state.sessions
     total_sessions = len(sessions)
     
     print(f"\nCurrent State:")
@@ -55,20 +55,28 @@ def meta_reasoner_node( state: AgentState) -> Dict[str, Any]:
     print(f"   Stuck Counter: {stuck_counter}")
     print(f"   Total Sessions: {total_sessions}")
     
+    # Reaching the target or running out of attempts decides the outcome by
+    # the prompt's own criteria, so these cases skip the LLM call
+    if current_proficiency >= target_proficiency:
+        return _decided_without_llm("end_success", True, "Current proficiency has reached the target proficiency")
+    if current_attempt >= max_attempts:
+        return _decided_without_llm("end_max_attempts", False, "Maximum number of attempts reached")
+    
     progress_percentage = (current_proficiency / target_proficiency * 100) if target_proficiency > 0 else 0.0
     
     recent_sessions = sessions[-5:] if len(sessions) >= 5 else sessions
     recent_summary = _build_recent_summary(recent_sessions)
     
-    if recent_sessions:
-        avg_recent_score = sum(s["score"] for s in recent_sessions) / len(recent_sessions)
+    recent_scores = [s.score for s in recent_sessions]
+    if recent_scores:
+        avg_recent_score = sum(recent_scores) / len(recent_scores)
     else:
         avg_recent_score = 0.5
     
-    trend = _calculate_trend(recent_sessions)
+    trend = _calculate_trend(recent_scores)
     
     if total_sessions > 0:
-        initial_proficiency = state.get("estimated_level", 0.0)
+        initial_proficiency = state.estimated_level
         if total_sessions == 1:
             progress_rate = (current_proficiency - initial_proficiency) / 1.0
         else:
@@ -83,44 +91,37 @@ def meta_reasoner_node( state: AgentState) -> Dict[str, Any]:
     
     print(f"\nMeta-reasoning about next action...")
     
-    prompt = META_REASONER_PROMPT.format(
-        topic=topic,
-        learning_goal=learning_goal,
-        current_proficiency=current_proficiency,
-        target_proficiency=target_proficiency,
-        progress_percentage=progress_percentage,
-        current_attempt=current_attempt,
-        max_attempts=max_attempts,
-        consecutive_failures=consecutive_failures,
-        stuck_counter=stuck_counter,
-        total_sessions=total_sessions,
-        recent_summary=recent_summary,
-        avg_recent_score=avg_recent_score,
-        trend=trend,
-        progress_rate=progress_rate
-    )
-    
-    llm = get_llm(use_mock=False)
-    response = llm.invoke(prompt)
-    
-    if hasattr(response, 'content'):
-        response_text = response.content
-    else:
-        response_text = str(response)
+    prompt = META_REASONER_PROMPT.format_map({
+        "topic": topic,
+        "learning_goal": learning_goal,
+        "current_proficiency": current_proficiency,
+        "target_proficiency": target_proficiency,
+        "progress_percentage": progress_percentage,
+        "current_attempt": current_attempt,
+        "max_attempts": max_attempts,
+        "consecutive_failures": consecutive_failures,
+        "stuck_counter": stuck_counter,
+        "total_sessions": total_sessions,
+        "recent_summary": recent_summary,
+        "avg_recent_score": avg_recent_score,
+        "trend": trend,
+        "progress_rate": progress_rate
+    })
+    
+    llm = get_llm()
+    response_text = await llm.ainvoke(prompt)
     
     print(f"LLM response received")
     
     print(f"\nParsing meta-reasoner decision...")
     
-    try:
-        decision_data = parse_meta_reasoner_decision(response_text)
+    decision_data, parsed = try_parse(response_text, parse_meta_reasoner_decision)
+    
+    if parsed:
         print(f"Successfully parsed decision")
-        
-    except Exception as e:
-        print(f"Parse error: {e}")
+        llm.commit(response_text)
+    else:
         print(f"   Using fallback decision")
-        
-        decision_data = safe_parse(response_text, parse_meta_reasoner_decision)
     
     next_action = decision_data["next_action"]
     goal_achieved = decision_data["goal_achieved"]
@@ -149,37 +150,54 @@ def meta_reasoner_node( state: AgentState) -> Dict[str, Any]:
         "goal_achieved": goal_achieved,
         "needs_prerequisite": needs_prerequisite,
         "prerequisite_topic": prerequisite_topic,
-        "decision_log": state.get("decision_log", []) + [decision]
+        "decision_log": [decision]
     }
     
     return updates
 
 
+def _decided_without_llm(next_action: str, goal_achieved: bool, reasoning: str) -> Dict[str, Any]:
+    print(f"\nMeta-Reasoner Decision (no LLM call needed):")
+    print(f"   Next Action: {next_action}")
+    print(f"   Goal Achieved: {goal_achieved}")
+    print(f"   Reasoning: {reasoning}")
+    
+    decision = (
+        f"🧠 Meta-Reasoner: {next_action.upper()} | "
+        f"Goal: {'Yes' if goal_achieved else 'No'} | "
+        f"Reason: {reasoning[:60]}..."
+    )
+    
+    return {
+        "next_action": next_action,
+        "goal_achieved": goal_achieved,
+        "needs_prerequisite": False,
+        "prerequisite_topic": "",
+        "decision_log": [decision]
+    }
+
+
 def _build_recent_summary(recent_sessions: list) -> str:
     if not recent_sessions:
         return "No sessions yet"
     
     summary_parts = []
     for i, session in enumerate(recent_sessions, 1):
-        session_num = session.get("session_id", i)
-        strategy = session.get("strategy", "unknown")
-        score = session.get("score", 0.0)
         summary_parts.append(
-            f"Session {session_num}: {strategy} → Score {score:.2f}"
+            f"Session {session.session_id}: {session.strategy} → Score {session.score:.2f}"
         )
     
     return "\n".join(summary_parts)
 
 
-def _calculate_trend(recent_sessions: list) -> str:
-    if len(recent_sessions) < 2:
+def _calculate_trend(scores: List[float]) -> str:
+    if len(scores) < 2:
         return "insufficient_data"
     
-    scores = [s.get("score", 0.0) for s in recent_sessions]
-    
     mid = len(scores) // 2
-    first_half_avg = sum(scores[:mid]) / len(scores[:mid])
-    second_half_avg = sum(scores[mid:]) / len(scores[mid:])
+    first_half_total = sum(scores[:mid])
+    first_half_avg = first_half_total / mid
+    second_half_avg = (sum(scores) - first_half_total) / (len(scores) - mid)
     
     diff = second_half_avg - first_half_avg
     
@@ -1,7 +1,8 @@
+import dataclasses
 from typing import Dict, Any
 
 from core.state import AgentState
-from config.parsers import parse_practice_question, safe_parse
+from config.parsers import parse_practice_question, try_parse
 from config.prompts import PRACTICE_QUESTION_PROMPT
 from tools.llm import get_llm
 
@@ -28,11 +29,12 @@ def practice_node(state: AgentState) -> Dict[str, Any]:
     print("Practice Node")
     print("="*60)
     
-    strategy = state.get("current_strategy", "direct_explanation")
-    topic = state.get("topic", "Unknown Topic")
-    student_level = state.get("current_proficiency", 0.5)
-    current_explanation = state.get("current_explanation", "")
-    teaching_data = state.get("current_teaching_data", {})
+    current = state.current
+    strategy = current.strategy or "direct_explanation"
+    topic = state.topic
+    student_level = state.current_proficiency
+    current_explanation = current.explanation
+    teaching_data = current.data
     
     print(f"\nStrategy: {strategy}")
     print(f"Topic: {topic}")
@@ -49,27 +51,20 @@ def practice_node(state: AgentState) -> Dict[str, Any]:
         teaching_summary=teaching_summary
     )
     
-    llm = get_llm(use_mock=False)
-    response = llm.invoke(prompt)
-    
-    if hasattr(response, 'content'):
-        response_text = response.content
-    else:
-        response_text = str(response)
+    llm = get_llm()
+    response_text = llm.invoke(prompt)
     
     print(f"LLM response received")
     
     print(f"\nParsing practice question...")
     
-    try:
-        practice_data = parse_practice_question(response_text)
+    practice_data, parsed = try_parse(response_text, parse_practice_question)
+    
+    if parsed:
         print(f"Successfully parsed practice question")
-        
-    except Exception as e:
-        print(f"Parse error: {e}")
+        llm.commit(response_text)
+    else:
         print(f"   Using fallback practice question")
-        
-        practice_data = safe_parse(response_text, parse_practice_question)
     
     question = practice_data.get("question", "What did you learn?")
     expected_answer = practice_data.get("expected_answer", "Student should demonstrate understanding")
@@ -98,10 +93,13 @@ def practice_node(state: AgentState) -> Dict[str, Any]:
     print(f"\nAnswer collected. Ready for evaluation.")
     
     return {
-        "current_question": question,
-        "current_correct_answer": expected_answer,
-        "current_user_answer": user_answer,
-        "current_question_difficulty": difficulty
+        "current": dataclasses.replace(
+            current,
+            question=question,
+            correct_answer=expected_answer,
+            user_answer=user_answer,
+            difficulty=difficulty
+        )
     }
 
 
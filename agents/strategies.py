@@ -1,13 +1,72 @@
 
-from typing import List, Dict, Any
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Tuple
+import dataclasses
+import functools
 import json
 from datetime import datetime
 
-from core.state import TeachingStrategy
-from config.prompts import STRATEGY_PROMPTS, STRATEGY_SELECTION_PROMPT
+from core.state import LearningSession, TeachingStrategy
+from config.prompts import STRATEGY_PROMPTS, STRATEGY_SELECTION_PROMPT, MULTI_STRATEGY_PROMPT
 
 
-def get_default_strategies() -> List[TeachingStrategy]:
+# The core strategies are immutable, so one shared tuple serves every caller
+DEFAULT_STRATEGIES: Tuple[TeachingStrategy, ...] = (
+    TeachingStrategy(
+        name="direct_explanation",
+        description=(
+            "Provide clear, structured explanation with definitions and key concepts. "
+            "Best for logical, analytical learners."
+        ),
+        effectiveness=0.7  # Initial neutral score
+    ),
+    
+    TeachingStrategy(
+        name="socratic",
+        description=(
+            "Guide understanding through thought-provoking questions. "
+            "Let student discover concepts rather than telling directly. "
+            "Best for discovery-oriented learners."
+        ),
+        effectiveness=0.7
+    ),
+    
+    TeachingStrategy(
+        name="worked_example",
+        description=(
+            "Demonstrate step-by-step problem solving with concrete example. "
+            "Show the process, not just the result. "
+            "Best for visual and procedural learners."
+        ),
+        effectiveness=0.7
+    ),
+    
+    TeachingStrategy(
+        name="analogy",
+        description=(
+            "Explain using relatable real-world analogies and metaphors. "
+            "Connect abstract concepts to familiar experiences. "
+            "Best for abstract thinkers."
+        ),
+        effectiveness=0.7
+    ),
+    
+    TeachingStrategy(
+        name="visual",
+        description=(
+            "Use diagrams, flowcharts, or visual representations. "
+            "Describe spatial relationships and structures. "
+            "Best for visual learners."
+        ),
+        effectiveness=0.7
+    ),
+)
+
+# Zeroed per-strategy attempt counts; callers copy this with dict()
+DEFAULT_STRATEGY_ATTEMPTS: Mapping[str, int] = MappingProxyType({s.name: 0 for s in DEFAULT_STRATEGIES})
+
+
+def get_default_strategies() -> Tuple[TeachingStrategy, ...]:
     """
     Returns the 5 core teaching strategies available to the agent.
     
@@ -15,57 +74,7 @@ def get_default_strategies() -> List[TeachingStrategy]:
     As the agent uses them, effectiveness updates based on actual results.
     """
     
-    return [
-        TeachingStrategy(
-            name="direct_explanation",
-            description=(
-                "Provide clear, structured explanation with definitions and key concepts. "
-                "Best for logical, analytical learners."
-            ),
-            effectiveness=0.7  # Initial neutral score
-        ),
-        
-        TeachingStrategy(
-            name="socratic",
-            description=(
-                "Guide understanding through thought-provoking questions. "
-                "Let student discover concepts rather than telling directly. "
-                "Best for discovery-oriented learners."
-            ),
-            effectiveness=0.7
-        ),
-        
-        TeachingStrategy(
-            name="worked_example",
-            description=(
-                "Demonstrate step-by-step problem solving with concrete example. "
-                "Show the process, not just the result. "
-                "Best for visual and procedural learners."
-            ),
-            effectiveness=0.7
-        ),
-        
-        TeachingStrategy(
-            name="analogy",
-            description=(
-                "Explain using relatable real-world analogies and metaphors. "
-                "Connect abstract concepts to familiar experiences. "
-                "Best for abstract thinkers."
-            ),
-            effectiveness=0.7
-        ),
-        
-        TeachingStrategy(
-            name="visual",
-            description=(
-                "Use diagrams, flowcharts, or visual representations. "
-                "Describe spatial relationships and structures. "
-                "Best for visual learners."
-            ),
-            effectiveness=0.7
-        ),
-    ]
-
+    return DEFAULT_STRATEGIES
 
 
 def update_strategy_effectiveness(
@@ -100,9 +109,9 @@ def update_strategy_effectiveness(
     updated_strategies = []
     
     for strategy in strategies:
-        if strategy["name"] == strategy_name:
+        if strategy.name == strategy_name:
             # Update this strategy's effectiveness
-            old_effectiveness = strategy["effectiveness"]
+            old_effectiveness = strategy.effectiveness
             new_effectiveness = (
                 (old_effectiveness * (1 - learning_rate)) + 
                 (score * learning_rate)
@@ -111,9 +120,7 @@ def update_strategy_effectiveness(
             # Clamp between 0.0 and 1.0
             new_effectiveness = max(0.0, min(1.0, new_effectiveness))
             
-            updated_strategy = strategy.copy()
-            updated_strategy["effectiveness"] = new_effectiveness
-            updated_strategies.append(updated_strategy)
+            updated_strategies.append(dataclasses.replace(strategy, effectiveness=new_effectiveness))
         else:
             # Keep other strategies unchanged
             updated_strategies.append(strategy)
@@ -142,7 +149,7 @@ def get_viable_strategies(
     
     viable = [
         s for s in strategies
-        if strategy_attempts.get(s["name"], 0) < max_attempts
+        if strategy_attempts.get(s.name, 0) < max_attempts
     ]
     
     # If all strategies exhausted, reset and return all
@@ -154,7 +161,7 @@ def get_viable_strategies(
 
 def rank_strategies(
     strategies: List[TeachingStrategy],
-    recent_sessions: List[Dict]
+    recent_sessions: List[LearningSession]
 ) -> List[TeachingStrategy]:
     """
     Rank strategies by effectiveness, considering recent context.
@@ -170,13 +177,14 @@ def rank_strategies(
     # ranking by effectiveness
     ranked = sorted(
         strategies,
-        key=lambda s: s["effectiveness"],
+        key=lambda s: s.effectiveness,
         reverse=True  # Highest first
     )
     
     return ranked
 
 
+@functools.lru_cache(maxsize=128)
 def get_strategy_prompt(strategy_name: str, topic: str, student_level: float = 0.5) -> str:
     """
     Get the teaching prompt for a specific strategy using JSON format.
@@ -199,6 +207,30 @@ def get_strategy_prompt(strategy_name: str, topic: str, student_level: float = 0
     return template.format(topic=topic, student_level=student_level)
 
 
+def get_multi_strategy_prompt(strategy_names: List[str], topic: str, student_level: float = 0.5) -> str:
+    """
+    Get a single prompt that asks for teaching content for several strategies.
+    
+    Args:
+        strategy_names: Strategies to generate content for
+        topic: What to teach
+        student_level: Student's current proficiency level
+    
+    Returns:
+        Formatted prompt whose JSON answer is keyed by strategy name
+    """
+    
+    strategy_sections = "\n\n".join(
+        f"### {name}\n{get_strategy_prompt(name, topic, student_level)}"
+        for name in strategy_names
+    )
+    
+    return MULTI_STRATEGY_PROMPT.format(
+        strategy_sections=strategy_sections,
+        strategy_names=", ".join(strategy_names)
+    )
+
+
 def get_strategy_selection_prompt(strategies_desc: str, recent_summary: str, 
                                   stuck_counter: int, consecutive_failures: int,
                                   current_proficiency: float, target_proficiency: float,
@@ -242,9 +274,9 @@ if __name__ == "__main__":
     
     print(f"\nAvailable Strategies ({len(strategies)}):")
     for s in strategies:
-        print(f"\n  {s['name']}:")
-        print(f"    {s['description'][:60]}...")
-        print(f"    Initial effectiveness: {s['effectiveness']:.2f}")
+        print(f"\n  {s.name}:")
+        print(f"    {s.description[:60]}...")
+        print(f"    Initial effectiveness: {s.effectiveness:.2f}")
     
     # Simulate some teaching sessions
     print("\n" + "="*70)
@@ -255,15 +287,15 @@ if __name__ == "__main__":
     print("\nSession 1: Using 'direct_explanation', score: 0.9")
     strategies = update_strategy_effectiveness(strategies, "direct_explanation", 0.9)
     
-    direct_strat = [s for s in strategies if s["name"] == "direct_explanation"][0]
-    print(f"   Updated effectiveness: {direct_strat['effectiveness']:.2f}")
+    direct_strat = [s for s in strategies if s.name == "direct_explanation"][0]
+    print(f"   Updated effectiveness: {direct_strat.effectiveness:.2f}")
     
     # Session 2: Socratic fails
     print("\nSession 2: Using 'socratic', score: 0.3")
     strategies = update_strategy_effectiveness(strategies, "socratic", 0.3)
     
-    socratic_strat = [s for s in strategies if s["name"] == "socratic"][0]
-    print(f"   Updated effectiveness: {socratic_strat['effectiveness']:.2f}")
+    socratic_strat = [s for s in strategies if s.name == "socratic"][0]
+    print(f"   Updated effectiveness: {socratic_strat.effectiveness:.2f}")
     
     # Rank strategies
     print("\n" + "="*70)
@@ -273,7 +305,7 @@ if __name__ == "__main__":
     ranked = rank_strategies(strategies, [])
     
     for i, s in enumerate(ranked, 1):
-        print(f"  {i}. {s['name']:20s} - {s['effectiveness']:.2f}")
+        print(f"  {i}. {s.name:20s} - {s.effectiveness:.2f}")
 
 
 class StrategyEffectivenessTracker:
@@ -409,15 +441,18 @@ class StrategyEffectivenessTracker:
         if not filename:
             filename = f"strategy_tracking_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
-        data = {
-            "session_history": self.session_history,
-            "strategy_stats": self.strategy_stats,
-            "export_timestamp": datetime.now().isoformat()
-        }
-        
+        # Stream the history one record at a time instead of building the
+        # whole export document in memory before dumping it.
         with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
-        
+            f.write('{\n  "session_history": [')
+            for i, record in enumerate(self.session_history):
+                f.write(",\n    " if i else "\n    ")
+                f.write(json.dumps(record))
+            f.write("\n  ],\n")
+            f.write(f'  "strategy_stats": {json.dumps(self.strategy_stats)},\n')
+            f.write(f'  "export_timestamp": {json.dumps(datetime.now().isoformat())}\n')
+            f.write("}\n")
+
         return filename
     
     def load_data(self, filename: str):
@@ -438,15 +473,21 @@ def track_session_effectiveness(strategy_name: str, score: float, topic: str,
 
 def get_contextual_effectiveness(strategies: List[TeachingStrategy], 
                                 context: Dict[str, Any] = None) -> List[TeachingStrategy]:
-        
+
+    # Nothing recorded yet: every strategy keeps its current effectiveness
+    if not effectiveness_tracker.strategy_stats:
+        return strategies
+
     updated_strategies = []
-    
+
     for strategy in strategies:
-        strategy_name = strategy["name"]
+        strategy_name = strategy.name
         contextual_score = effectiveness_tracker.get_strategy_effectiveness(strategy_name, context)
-        
-        updated_strategy = strategy.copy()
-        updated_strategy["effectiveness"] = contextual_score
-        updated_strategies.append(updated_strategy)
+
+        if contextual_score == strategy.effectiveness:
+            updated_strategies.append(strategy)
+            continue
+
+        updated_strategies.append(dataclasses.replace(strategy, effectiveness=contextual_score))
     
     return updated_strategies
\ No newline at end of file
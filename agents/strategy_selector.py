@@ -1,3 +1,4 @@
+import dataclasses
 from typing import Dict, Any, List
 
 
@@ -17,13 +18,13 @@ def strategy_selector_node(state: AgentState) -> Dict[str, Any]:
     print("="*60)
     
 
-    available_strategies = state.get("available_strategies", [])
-    strategy_attempts = state.get("strategy_attempts", {})
-    sessions = state.get("sessions", [])
-    stuck_counter = state.get("stuck_counter", 0)
-    consecutive_failures = state.get("consecutive_failures", 0)
-    current_proficiency = state.get("current_proficiency", 0.0)
-    target_proficiency = state.get("target_proficiency", 0.8)
+    available_strategies = state.available_strategies
+    strategy_attempts = state.strategy_attempts
+    sessions = state.sessions
+    stuck_counter = state.stuck_counter
+    consecutive_failures = state.consecutive_failures
+    current_proficiency = state.current_proficiency
+    target_proficiency = state.target_proficiency
     
     print(f"\nCurrent context:")
     print(f"  - Available strategies: {len(available_strategies)}")
@@ -48,20 +49,20 @@ def strategy_selector_node(state: AgentState) -> Dict[str, Any]:
         decision = "Reset strategy attempts - trying fresh approach"
         
         return {
-            "strategy_attempts": {s["name"]: 0 for s in available_strategies},
-            "decision_log": state.get("decision_log", []) + [decision]
+            "strategy_attempts": {s.name: 0 for s in available_strategies},
+            "decision_log": [decision]
         }
     
     recent_sessions = sessions[-3:] if len(sessions) >= 3 else sessions
     
     print(f"\nRecent performance:")
     for i, session in enumerate(recent_sessions, 1):
-        print(f"  {i}. {session['strategy']:20s} - Score: {session['score']:.2f}")
+        print(f"  {i}. {session.strategy:20s} - Score: {session.score:.2f}")
     
     if recent_sessions:
         recent_summary = "\n".join([
-            f"- Session {session['session_id']}: "
-            f"Strategy '{session['strategy']}' → Score {session['score']:.2f}"
+            f"- Session {session.session_id}: "
+            f"Strategy '{session.strategy}' → Score {session.score:.2f}"
             for session in recent_sessions
         ])
     else:
@@ -70,20 +71,20 @@ def strategy_selector_node(state: AgentState) -> Dict[str, Any]:
     ranked_strategies = rank_strategies(viable_strategies, recent_sessions)
     
     strategies_desc = "\n".join([
-        f"- {s['name']:20s} | "
-        f"Effectiveness: {s['effectiveness']:.2f} | "
-        f"Attempts: {strategy_attempts.get(s['name'], 0)} | "
-        f"Description: {s['description'][:50]}..."
+        f"- {s.name:20s} | "
+        f"Effectiveness: {s.effectiveness:.2f} | "
+        f"Attempts: {strategy_attempts.get(s.name, 0)} | "
+        f"Description: {s.description[:50]}..."
         for s in ranked_strategies
     ])
     
     print(f"\nStrategy options (ranked by effectiveness):")
     for s in ranked_strategies:
-        print(f"  - {s['name']:20s} (eff: {s['effectiveness']:.2f})")
+        print(f"  - {s.name:20s} (eff: {s.effectiveness:.2f})")
     
     print(f"\nAgent reasoning about strategy choice...")
     
-    llm = get_llm(use_mock=True)
+    llm = get_llm()
     
     prompt = get_strategy_selection_prompt(
         strategies_desc=strategies_desc,
@@ -99,6 +100,7 @@ def strategy_selector_node(state: AgentState) -> Dict[str, Any]:
         response = llm.invoke(prompt)
         
         data = parse_strategy_selection(response)
+        llm.commit(response)
         
         chosen_strategy = data["chosen_strategy"]
         reasoning = data["reasoning"]
@@ -113,15 +115,15 @@ def strategy_selector_node(state: AgentState) -> Dict[str, Any]:
         print(f"\nError in meta-reasoning: {e}")
         print(f"  Falling back to highest effectiveness strategy")
         
-        chosen_strategy = ranked_strategies[0]["name"]
+        chosen_strategy = ranked_strategies[0].name
         reasoning = f"Fallback: chose highest effectiveness strategy"
         confidence = 0.5
     
-    valid_strategy_names = [s["name"] for s in viable_strategies]
+    valid_strategy_names = [s.name for s in viable_strategies]
     
     if chosen_strategy not in valid_strategy_names:
         print(f"Chosen strategy '{chosen_strategy}' not viable")
-        chosen_strategy = ranked_strategies[0]["name"]
+        chosen_strategy = ranked_strategies[0].name
         reasoning = f"Adjusted to viable strategy: {chosen_strategy}"
     
     new_attempts = strategy_attempts.copy()
@@ -138,9 +140,9 @@ def strategy_selector_node(state: AgentState) -> Dict[str, Any]:
     print(f"  - Attempts: {new_attempts[chosen_strategy]}")
     
     updates = {
-        "current_strategy": chosen_strategy,
+        "current": dataclasses.replace(state.current, strategy=chosen_strategy),
         "strategy_attempts": new_attempts,
-        "decision_log": state.get("decision_log", []) + [decision]
+        "decision_log": [decision]
     }
     
     return updates
@@ -156,8 +158,8 @@ def analyze_strategy_pattern(sessions: List[LearningSession]) -> Dict[str, Any]:
     strategy_performance = {}
     
     for session in sessions:
-        strategy = session["strategy"]
-        score = session["score"]
+        strategy = session.strategy
+        score = session.score
         
         if strategy not in strategy_performance:
             strategy_performance[strategy] = {"scores": [], "avg": 0.0}
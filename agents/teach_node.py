@@ -1,12 +1,23 @@
-from typing import Dict, Any
+import dataclasses
+import json
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 
 from core.state import AgentState
-from agents.strategies import get_strategy_prompt
-from config.parsers import parse_teaching_response, safe_parse
+from agents.strategies import get_strategy_prompt, get_multi_strategy_prompt
+from agents.teaching_content import process_teaching_data, stream_llm_text
+from config.parsers import ParseError, parse_teaching_response, parse_multi_strategy_response, try_parse
 from tools.llm import get_llm
 
 
-def teach_node(state: AgentState) -> Dict[str, Any]:
+TEACHING_CACHE_SIZE = 512
+
+# Raw teaching responses keyed by (strategy, topic, level rounded to 0.1),
+# kept in least-recently-used order
+_teaching_cache: "OrderedDict[Tuple[str, str, float], str]" = OrderedDict()
+
+
+async def teach_node(state: AgentState) -> Dict[str, Any]:
     """
     Generate and display teaching content using the selected strategy.
     
@@ -28,158 +39,104 @@ def teach_node(state: AgentState) -> Dict[str, Any]:
     print("Teach Node")
     print("="*60)
     
-    strategy = state.get("current_strategy", "direct_explanation")
-    topic = state.get("topic", "Unknown Topic")
-    student_level = state.get("current_proficiency", 0.5)
+    current = state.current
+    strategy = current.strategy or "direct_explanation"
+    topic = state.topic
+    student_level = state.current_proficiency
     
     print(f"\nTeaching Strategy: {strategy}")
     print(f"Topic: {topic}")
     print(f"Student Level: {student_level:.2f}")
     
-    print(f"\nGenerating teaching content...")
+    cache_key = (strategy, topic, round(student_level, 1))
+    response_text = _get_cached_teaching_text(cache_key)
     
-    prompt = get_strategy_prompt(strategy, topic, student_level)
-    
-    llm = get_llm(use_mock=False)
-    response = llm.invoke(prompt)
+    if response_text is None and state.probe_all_strategies:
+        strategy_names = [
+            s.name for s in state.available_strategies
+            if _get_cached_teaching_text((s.name, topic, cache_key[2])) is None
+        ]
+        if strategy not in strategy_names:
+            strategy_names.append(strategy)
+        
+        await _probe_strategies(strategy_names, topic, student_level)
+        response_text = _get_cached_teaching_text(cache_key)
     
-    if hasattr(response, 'content'):
-        response_text = response.content
+    llm = None
+    if response_text is not None:
+        print(f"\nReusing cached teaching content")
     else:
-        response_text = str(response)
-    
-    print(f"LLM response received")
+        print(f"\nGenerating teaching content...")
+        
+        prompt = get_strategy_prompt(strategy, topic, student_level)
+        llm = get_llm()
+        response_text = await stream_llm_text(llm, prompt)
+        
+        print(f"LLM response received")
     
     print(f"\nParsing teaching response...")
     
-    try:
-        teaching_data = parse_teaching_response(response_text, strategy)
+    teaching_data, parsed = try_parse(response_text, parse_teaching_response, strategy)
+    
+    if parsed:
         print(f"Successfully parsed {strategy} response")
-
-        _display_teaching_content(strategy, teaching_data)
-        
-    except Exception as e:
-        print(f"Parse error: {e}")
+        _cache_teaching_text(cache_key, response_text)
+        if llm is not None:
+            llm.commit(response_text)
+    else:
         print(f"   Using fallback teaching data")
-        
-        teaching_data = safe_parse(response_text, parse_teaching_response, strategy)
     
-    explanation = _extract_explanation(strategy, teaching_data)
+    explanation, display_text = process_teaching_data(strategy, teaching_data, display=parsed)
+    if display_text:
+        print(display_text)
     
     decision = f"Taught {topic} using {strategy} strategy"
     
     return {
-        "current_explanation": explanation,
-        "current_teaching_data": teaching_data,
-        "decision_log": state.get("decision_log", []) + [decision]
+        "current": dataclasses.replace(current, explanation=explanation, data=teaching_data),
+        "decision_log": [decision]
     }
 
 
-def _display_teaching_content(strategy: str, teaching_data: Dict[str, Any]):
-    print(f"\nTeaching Content ({strategy}):")
-    
-    if strategy == "direct_explanation":
-        explanation = teaching_data.get('explanation', 'N/A')
-        print(f"   Explanation: {explanation}")
-        key_points = teaching_data.get('key_points', [])
-        if key_points:
-            print(f"\n   Key Points:")
-            for i, point in enumerate(key_points, 1):
-                print(f"     {i}. {point}")
-        
-    elif strategy == "socratic":
-        questions = teaching_data.get("questions", [])
-        print(f"   Questions ({len(questions)}):")
-        for i, q in enumerate(questions, 1):
-            print(f"     {i}. {q}")
-        sequence = teaching_data.get("question_sequence", "")
-        if sequence:
-            print(f"\n   Sequence: {sequence}")
-        
-    elif strategy == "worked_example":
-        problem = teaching_data.get('problem_statement', 'N/A')
-        print(f"   Problem: {problem}")
-        steps = teaching_data.get("solution_steps", [])
-        print(f"\n   Solution Steps ({len(steps)}):")
-        for step in steps:
-            step_num = step.get('step', '?')
-            action = step.get('action', 'N/A')
-            explanation = step.get('explanation', '')
-            print(f"     Step {step_num}: {action}")
-            if explanation:
-                print(f"       Why: {explanation}")
-        final_answer = teaching_data.get("final_answer", "")
-        if final_answer:
-            print(f"\n   Final Answer: {final_answer}")
-        
-    elif strategy == "analogy":
-        analogy_concept = teaching_data.get('analogy_concept', 'N/A')
-        print(f"   Analogy Concept: {analogy_concept}")
-        explanation = teaching_data.get('explanation', '')
-        if explanation:
-            print(f"\n   Explanation: {explanation}")
-        mapping = teaching_data.get("analogy_mapping", {})
-        if mapping:
-            print(f"\n   Mapping:")
-            for concept_feature, analogy_feature in mapping.items():
-                print(f"     {concept_feature} → {analogy_feature}")
-        limitations = teaching_data.get("limitations", "")
-        if limitations:
-            print(f"\n   Limitations: {limitations}")
-        
-    elif strategy == "visual":
-        visual_type = teaching_data.get('visual_type', 'N/A')
-        print(f"   Visual Type: {visual_type}")
-        description = teaching_data.get('visual_description', 'N/A')
-        print(f"\n   Description: {description}")
-        ascii_art = teaching_data.get("ascii_art", "")
-        if ascii_art:
-            print(f"\n   ASCII Art:\n{ascii_art}")
-        components = teaching_data.get("key_components", [])
-        if components:
-            print(f"\n   Key Components ({len(components)}):")
-            for component in components:
-                comp_name = component.get('component', '?')
-                position = component.get('position', '?')
-                purpose = component.get('purpose', '?')
-                print(f"     - {comp_name}: {position} ({purpose})")
-        connections = teaching_data.get("connections", "")
-        if connections:
-            print(f"\n   Connections: {connections}")
+async def _probe_strategies(strategy_names: List[str], topic: str, student_level: float):
+    """
+    Generate teaching content for several strategies with a single LLM call.
+    
+    Each strategy's parsed content is stored in the teaching cache, so the
+    current strategy and any later switch at the same level are cache hits.
+    If the combined response does not parse, nothing is cached and the
+    caller falls back to a single-strategy request.
+    """
+    
+    print(f"\nGenerating teaching content for {len(strategy_names)} strategies in one call...")
+    
+    prompt = get_multi_strategy_prompt(strategy_names, topic, student_level)
+    llm = get_llm()
+    response_text = await stream_llm_text(llm, prompt)
+    
+    try:
+        parsed = parse_multi_strategy_response(response_text, strategy_names)
+    except ParseError as e:
+        print(f"Parse error: {e}")
+        print(f"   Falling back to single-strategy generation")
+        return
+    
+    llm.commit(response_text)
+    
+    level_bucket = round(student_level, 1)
+    for strategy_name, teaching_data in parsed.items():
+        _cache_teaching_text((strategy_name, topic, level_bucket), json.dumps(teaching_data))
 
 
-def _extract_explanation(strategy: str, teaching_data: Dict[str, Any]) -> str:        
-    if strategy == "direct_explanation":
-        return teaching_data.get("explanation", "Direct explanation provided")
-    
-    elif strategy == "socratic":
-        questions = teaching_data.get("questions", [])
-        if questions:
-            return f"Socratic questions: {'; '.join(questions)}"
-        return "Socratic questions provided"
-    
-    elif strategy == "worked_example":
-        problem = teaching_data.get("problem_statement", "Worked example provided")
-        steps = teaching_data.get("solution_steps", [])
-        if steps:
-            step_summary = "; ".join([f"Step {s.get('step', '?')}: {s.get('action', '')}" 
-                                     for s in steps[:3]])
-            return f"Worked example: {problem[:100]}... Steps: {step_summary}"
-        return f"Worked example: {problem[:100]}..."
-    
-    elif strategy == "analogy":
-        analogy = teaching_data.get("analogy_concept", "Analogy provided")
-        explanation = teaching_data.get("explanation", "")
-        if explanation:
-            return f"Analogy: {analogy}. {explanation[:100]}..."
-        return f"Analogy: {analogy}"
-    
-    elif strategy == "visual":
-        visual_type = teaching_data.get("visual_type", "Visual representation")
-        description = teaching_data.get("visual_description", "")
-        if description:
-            return f"Visual ({visual_type}): {description[:100]}..."
-        return f"Visual: {visual_type}"
-    
-    else:
-        return "Teaching content provided"
+def _get_cached_teaching_text(key: Tuple[str, str, float]) -> Optional[str]:
+    response_text = _teaching_cache.get(key)
+    if response_text is not None:
+        _teaching_cache.move_to_end(key)
+    return response_text
+
+
+def _cache_teaching_text(key: Tuple[str, str, float], response_text: str):
+    _teaching_cache[key] = response_text
+    _teaching_cache.move_to_end(key)
+    if len(_teaching_cache) > TEACHING_CACHE_SIZE:
+        _teaching_cache.popitem(last=False)
@@ -0,0 +1,155 @@
+from typing import Dict, Any, List, Optional, Tuple
+
+from utils.log_utils import VERBOSE
+
+
+def process_teaching_data(strategy: str, teaching_data: Dict[str, Any], display: bool = True) -> Tuple[str, str]:
+    """
+    Walk teaching_data once to build both the explanation stored in state
+    and the formatted content block shown to the student.
+    
+    Args:
+        strategy: Teaching strategy that produced the data
+        teaching_data: Parsed teaching response
+        display: Whether to format the display block at all
+        
+    Returns:
+        Tuple of (explanation, display text); display text is empty when
+        display is False
+    """
+    lines = [f"\nTeaching Content ({strategy}):"] if display else None
+    
+    processor = _TEACHING_PROCESSORS.get(strategy, _process_default)
+    summary = processor(teaching_data, lines)
+    
+    return summary, "\n".join(lines) if display else ""
+
+
+async def stream_llm_text(llm, prompt: str) -> str:
+    """
+    Stream a teaching response and return the full text. A progress dot is
+    printed per chunk when VERBOSE is set.
+    """
+    chunks = []
+    async for chunk in llm.astream(prompt):
+        chunks.append(chunk)
+        if VERBOSE:
+            print(".", end="", flush=True)
+    if VERBOSE:
+        print()
+    return "".join(chunks)
+
+
+def _process_direct_explanation(teaching_data: Dict[str, Any], lines: Optional[List[str]]) -> str:
+    explanation = teaching_data.get("explanation")
+    if lines is not None:
+        lines.append(f"   Explanation: {explanation if explanation is not None else 'N/A'}")
+        key_points = teaching_data.get('key_points', [])
+        if key_points:
+            lines.append(f"\n   Key Points:")
+            for i, point in enumerate(key_points, 1):
+                lines.append(f"     {i}. {point}")
+    
+    return explanation if explanation is not None else "Direct explanation provided"
+
+
+def _process_socratic(teaching_data: Dict[str, Any], lines: Optional[List[str]]) -> str:
+    questions = teaching_data.get("questions", [])
+    if lines is not None:
+        lines.append(f"   Questions ({len(questions)}):")
+        for i, q in enumerate(questions, 1):
+            lines.append(f"     {i}. {q}")
+        sequence = teaching_data.get("question_sequence", "")
+        if sequence:
+            lines.append(f"\n   Sequence: {sequence}")
+    
+    if questions:
+        return f"Socratic questions: {'; '.join(questions)}"
+    return "Socratic questions provided"
+
+
+def _process_worked_example(teaching_data: Dict[str, Any], lines: Optional[List[str]]) -> str:
+    problem = teaching_data.get("problem_statement")
+    steps = teaching_data.get("solution_steps", [])
+    if lines is not None:
+        lines.append(f"   Problem: {problem if problem is not None else 'N/A'}")
+        lines.append(f"\n   Solution Steps ({len(steps)}):")
+        for step in steps:
+            step_num = step.get('step', '?')
+            action = step.get('action', 'N/A')
+            step_explanation = step.get('explanation', '')
+            lines.append(f"     Step {step_num}: {action}")
+            if step_explanation:
+                lines.append(f"       Why: {step_explanation}")
+        final_answer = teaching_data.get("final_answer", "")
+        if final_answer:
+            lines.append(f"\n   Final Answer: {final_answer}")
+    
+    problem_summary = (problem if problem is not None else "Worked example provided")[:100]
+    if steps:
+        step_summary = "; ".join([f"Step {s.get('step', '?')}: {s.get('action', '')}" 
+                                 for s in steps[:3]])
+        return f"Worked example: {problem_summary}... Steps: {step_summary}"
+    return f"Worked example: {problem_summary}..."
+
+
+def _process_analogy(teaching_data: Dict[str, Any], lines: Optional[List[str]]) -> str:
+    analogy_concept = teaching_data.get("analogy_concept")
+    explanation = teaching_data.get("explanation", "")
+    if lines is not None:
+        lines.append(f"   Analogy Concept: {analogy_concept if analogy_concept is not None else 'N/A'}")
+        if explanation:
+            lines.append(f"\n   Explanation: {explanation}")
+        mapping = teaching_data.get("analogy_mapping", {})
+        if mapping:
+            lines.append(f"\n   Mapping:")
+            for concept_feature, analogy_feature in mapping.items():
+                lines.append(f"     {concept_feature} → {analogy_feature}")
+        limitations = teaching_data.get("limitations", "")
+        if limitations:
+            lines.append(f"\n   Limitations: {limitations}")
+    
+    analogy = analogy_concept if analogy_concept is not None else "Analogy provided"
+    if explanation:
+        return f"Analogy: {analogy}. {explanation[:100]}..."
+    return f"Analogy: {analogy}"
+
+
+def _process_visual(teaching_data: Dict[str, Any], lines: Optional[List[str]]) -> str:
+    visual_type = teaching_data.get("visual_type")
+    description = teaching_data.get("visual_description")
+    if lines is not None:
+        lines.append(f"   Visual Type: {visual_type if visual_type is not None else 'N/A'}")
+        lines.append(f"\n   Description: {description if description is not None else 'N/A'}")
+        ascii_art = teaching_data.get("ascii_art", "")
+        if ascii_art:
+            lines.append(f"\n   ASCII Art:\n{ascii_art}")
+        components = teaching_data.get("key_components", [])
+        if components:
+            lines.append(f"\n   Key Components ({len(components)}):")
+            for component in components:
+                comp_name = component.get('component', '?')
+                position = component.get('position', '?')
+                purpose = component.get('purpose', '?')
+                lines.append(f"     - {comp_name}: {position} ({purpose})")
+        connections = teaching_data.get("connections", "")
+        if connections:
+            lines.append(f"\n   Connections: {connections}")
+    
+    visual_label = visual_type if visual_type is not None else "Visual representation"
+    if description:
+        return f"Visual ({visual_label}): {description[:100]}..."
+    return f"Visual: {visual_label}"
+
+
+def _process_default(teaching_data: Dict[str, Any], lines: Optional[List[str]]) -> str:
+    return "Teaching content provided"
+
+
+_TEACHING_PROCESSORS = {
+    "direct_explanation": _process_direct_explanation,
+    "socratic": _process_socratic,
+    "worked_example": _process_worked_example,
+    "analogy": _process_analogy,
+    "visual": _process_visual
+}
@@ -1,13 +1,25 @@
 from typing import Dict, Any
 import random
+from datetime import datetime
 
-from core.state import AgentState
+from core.state import AgentState, LearningSession
 from agents.strategies import get_strategy_prompt, update_strategy_effectiveness, track_session_effectiveness
-from config.parsers import parse_teaching_response, safe_parse
+from agents.teaching_content import process_teaching_data, stream_llm_text
+from config.parsers import parse_teaching_response, try_parse
 from tools.llm import get_llm
 
 
-def teaching_session_node(state: AgentState) -> Dict[str, Any]:
+# Simulated score bonus each strategy gives on top of the student's level
+STRATEGY_BONUSES = {
+    "direct_explanation": 0.0,
+    "socratic": 0.1,
+    "worked_example": 0.15,
+    "analogy": 0.05,
+    "visual": 0.1
+}
+
+
+async def teaching_session_node(state: AgentState) -> Dict[str, Any]:
     """
     Execute a teaching session using the selected strategy.
     
@@ -30,9 +42,12 @@ def teaching_session_node(state: AgentState) -> Dict[str, Any]:
     print("Teaching Session Node")
     print("="*60)
     
-    strategy = state.get("current_strategy", "direct_explanation")
-    topic = state.get("topic", "Unknown Topic")
-    student_level = state.get("current_proficiency", 0.5)
+    strategy = state.current.strategy or "direct_explanation"
+    topic = state.topic
+    student_level = state.current_proficiency
+    sessions = state.sessions
+    consecutive_failures = state.consecutive_failures
+    stuck_counter = state.stuck_counter
     
     print(f"\nTeaching Strategy: {strategy}")
     print(f"Topic: {topic}")
@@ -42,29 +57,24 @@ def teaching_session_node(state: AgentState) -> Dict[str, Any]:
     
     prompt = get_strategy_prompt(strategy, topic, student_level)
     
-    llm = get_llm(use_mock=False)
-    response = llm.invoke(prompt)
-    
-    if hasattr(response, 'content'):
-        response_text = response.content
-    else:
-        response_text = str(response)
+    llm = get_llm()
+    response_text = await stream_llm_text(llm, prompt)
     
     print(f"LLM response received")
     
     print(f"\nParsing teaching response...")
     
-    try:
-        teaching_data = parse_teaching_response(response_text, strategy)
+    teaching_data, parsed = try_parse(response_text, parse_teaching_response, strategy)
+    
+    if parsed:
         print(f"Successfully parsed {strategy} response")
-        
-        _display_teaching_content(strategy, teaching_data)
-        
-    except Exception as e:
-        print(f"Parse error: {e}")
+        llm.commit(response_text)
+    else:
         print(f"   Using fallback teaching data")
-        
-        teaching_data = safe_parse(response_text, parse_teaching_response, strategy)
+    
+    explanation, display_text = process_teaching_data(strategy, teaching_data, display=parsed)
+    if display_text:
+        print(display_text)
     
     print(f"\nSimulating student interaction...")
     
@@ -78,119 +88,58 @@ def teaching_session_node(state: AgentState) -> Dict[str, Any]:
     
     print(f"   Session Score: {session_score:.2f}")
 
-    session_id = len(state.get("sessions", [])) + 1
-    
-    session_record = {
-        "session_id": session_id,
-        "strategy": strategy,
-        "score": session_score,
-        "topic": topic,
-        "explanation": _extract_explanation(strategy, teaching_data),
-        "question": assessment_question,
-        "user_answer": "Simulated student response",
-        "correct_answer": expected_answer,
-        "feedback": f"Feedback based on {strategy} approach",
-        "timestamp": "2024-01-01T10:00:00",
-        "teaching_data": teaching_data
-    }
-    
-    new_sessions = state.get("sessions", []) + [session_record]
+    session_id = len(sessions) + 1
+    
+    session_record = LearningSession(
+        session_id=session_id,
+        strategy=strategy,
+        score=session_score,
+        topic=topic,
+        explanation=explanation,
+        question=assessment_question,
+        user_answer="Simulated student response",
+        correct_answer=expected_answer,
+        feedback=f"Feedback based on {strategy} approach",
+        timestamp=datetime.now().isoformat(),
+        student_level=student_level
+    )
     
     track_session_effectiveness(strategy, session_score, topic, student_level)
     
     updated_strategies = update_strategy_effectiveness(
-        state.get("available_strategies", []),
+        state.available_strategies,
         strategy,
         session_score
     )
     
     proficiency_gain = session_score * 0.1
-    new_proficiency = min(1.0, student_level + proficiency_gain)
+    new_proficiency = student_level + proficiency_gain
+    if new_proficiency > 1.0:
+        new_proficiency = 1.0
     
     print(f"\nLearning Progress:")
     print(f"   Proficiency Gain: +{proficiency_gain:.2f}")
     print(f"   New Proficiency: {new_proficiency:.2f}")
     
+    # 1 on failure, 0 on success: failure counters grow or reset without branching
+    failed = int(session_score < 0.6)
+    
     return {
-        "sessions": new_sessions,
+        "sessions": [session_record],
+        "strategy_running_stats": {strategy: (session_score, 1)},
         "available_strategies": updated_strategies,
         "current_proficiency": new_proficiency,
-        "consecutive_failures": 0 if session_score >= 0.6 else state.get("consecutive_failures", 0) + 1,
-        "stuck_counter": 0 if session_score >= 0.6 else state.get("stuck_counter", 0) + 1
+        "consecutive_failures": (consecutive_failures + 1) * failed,
+        "stuck_counter": (stuck_counter + 1) * failed
     }
 
 
-def _display_teaching_content(strategy: str, teaching_data: Dict[str, Any]):
-    print(f"\nTeaching Content ({strategy}):")
-    
-    if strategy == "direct_explanation":
-        print(f"   Explanation: {teaching_data.get('explanation', 'N/A')[:100]}...")
-        print(f"   Key Points: {teaching_data.get('key_points', [])}")
-        
-    elif strategy == "socratic":
-        questions = teaching_data.get("questions", [])
-        print(f"   Questions ({len(questions)}):")
-        for i, q in enumerate(questions, 1):
-            print(f"     {i}. {q}")
-        
-    elif strategy == "worked_example":
-        print(f"   Problem: {teaching_data.get('problem_statement', 'N/A')[:100]}...")
-        steps = teaching_data.get("solution_steps", [])
-        print(f"   Solution Steps ({len(steps)}):")
-        for step in steps[:3]:
-            print(f"     Step {step.get('step', '?')}: {step.get('action', 'N/A')[:50]}...")
-        
-    elif strategy == "analogy":
-        print(f"   Analogy: {teaching_data.get('analogy_concept', 'N/A')}")
-        mapping = teaching_data.get("analogy_mapping", {})
-        print(f"   Mapping: {list(mapping.keys())[:3]}...")
-        
-    elif strategy == "visual":
-        print(f"   Visual Type: {teaching_data.get('visual_type', 'N/A')}")
-        print(f"   Description: {teaching_data.get('visual_description', 'N/A')[:100]}...")
-        components = teaching_data.get("key_components", [])
-        print(f"   Components ({len(components)}): {[c.get('component', '?') for c in components[:3]]}")
-
-
 def _simulate_student_response(strategy: str, student_level: float, teaching_data: Dict[str, Any]) -> float:        
     base_score = student_level * 0.8 + 0.2
     
-    strategy_bonuses = {
-        "direct_explanation": 0.0,
-        "socratic": 0.1,
-        "worked_example": 0.15,
-        "analogy": 0.05,
-        "visual": 0.1
-    }
-    
-    bonus = strategy_bonuses.get(strategy, 0.0)
+    bonus = STRATEGY_BONUSES.get(strategy, 0.0)
     
     random_factor = random.uniform(-0.1, 0.1)
     
-    final_score = min(1.0, base_score + bonus + random_factor)
-    return max(0.0, final_score)
-
-
-def _extract_explanation(strategy: str, teaching_data: Dict[str, Any]) -> str:        
-    if strategy == "direct_explanation":
-        return teaching_data.get("explanation", "Direct explanation provided")
-    
-    elif strategy == "socratic":
-        questions = teaching_data.get("questions", [])
-        return f"Socratic questions: {'; '.join(questions[:2])}..."
-    
-    elif strategy == "worked_example":
-        problem = teaching_data.get("problem_statement", "Worked example provided")
-        return f"Worked example: {problem[:100]}..."
-    
-    elif strategy == "analogy":
-        analogy = teaching_data.get("analogy_concept", "Analogy provided")
-        return f"Analogy: {analogy}"
-    
-    elif strategy == "visual":
-        visual_type = teaching_data.get("visual_type", "Visual representation")
-        return f"Visual: {visual_type}"
-    
-    else:
-        return "Teaching content provided"
-
+    final_score = base_score + bonus + random_factor
+    return 1.0 if final_score > 1.0 else 0.0 if final_score < 0.0 else final_score
@@ -1,7 +1,54 @@
+import copy
 import json
-from typing import Dict, Any
+import sys
+from typing import Dict, Any, List, Tuple
 import re
 
+from utils.log_utils import logger
+
+try:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so the
+    # handlers below cover both parsers
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+
+# Body of a ``` fenced block, minus an optional "json" language tag
+_FENCE_RE = re.compile(r"```(?:\s*json\s*\n)?(.*?)```", re.IGNORECASE | re.DOTALL)
+
+
+# Required top-level fields for each response schema
+_REQ_DIAG = frozenset(("question", "expected_level", "reasoning"))
+_REQ_EVAL = frozenset(("quality_score", "reasoning", "strengths", "weaknesses", "level_indication"))
+_REQ_STRAT = frozenset(("chosen_strategy", "reasoning", "confidence"))
+_REQ_PRACTICE = frozenset(("question", "expected_answer", "difficulty"))
+_REQ_META = frozenset(("next_action", "goal_achieved", "needs_prerequisite", "reasoning"))
+_REQ_DE = frozenset(("explanation", "key_points", "assessment_question", "expected_answer", "reasoning"))
+_REQ_SOC = frozenset(("questions", "question_sequence", "assessment_question", "expected_answer", "reasoning"))
+_REQ_WE = frozenset(("problem_statement", "solution_steps", "final_answer", "assessment_question", "expected_answer", "reasoning"))
+_REQ_ANA = frozenset(("analogy_concept", "analogy_mapping", "explanation", "limitations", "assessment_question", "expected_answer", "reasoning"))
+_REQ_VIS = frozenset(("visual_type", "visual_description", "key_components", "connections", "assessment_question", "expected_answer", "reasoning"))
+_REQ_STEP = frozenset(("step", "action", "explanation"))
+_REQ_COMP = frozenset(("component", "position", "purpose"))
+
+# Synonyms the evaluator may use for each student level
+_LEVEL_MAPPING = {
+    "beginner": "beginner",
+    "novice": "beginner",
+    "basic": "beginner",
+    "elementary": "beginner",
+    "intermediate": "intermediate",
+    "medium": "intermediate",
+    "moderate": "intermediate",
+    "advanced": "advanced",
+    "expert": "advanced",
+    "proficient": "advanced"
+}
+_VALID_LEVELS = frozenset(("beginner", "intermediate", "advanced"))
+_VALID_STRATEGIES = frozenset(("direct_explanation", "socratic", "worked_example", "analogy", "visual"))
+_VALID_ACTIONS = frozenset(("continue", "end_success", "end_max_attempts", "end_stuck", "prerequisite"))
+
 
 class ParseError(Exception):
     pass
@@ -28,31 +75,32 @@ def parse_diagnostic_question(response: str) -> Dict[str, Any]:
         ParseError: If parsing fails
     """
     try:
-        data = json.loads(response)
+        data = _json_loads(response)
         
-        required_fields = ["question", "expected_level", "reasoning"]
-        for field in required_fields:
-            if field not in data:
-                raise ParseError(f"Missing required field: {field}")
+        missing = _REQ_DIAG - data.keys()
+        if missing:
+            raise ParseError(f"Missing required fields: {sorted(missing)}")
         
-        if not isinstance(data["question"], str):
+        if type(data["question"]) is not str:
             raise ParseError("Question must be a string")
         
-        if not isinstance(data["expected_level"], (int, float)):
+        if type(expected_level := data["expected_level"]) not in (int, float):
             raise ParseError("Expected level must be a number")
         
-        if not isinstance(data["reasoning"], str):
+        if type(data["reasoning"]) is not str:
             raise ParseError("Reasoning must be a string")
         
-        if not 0.0 <= data["expected_level"] <= 1.0:
+        if not 0.0 <= expected_level <= 1.0:
             raise ParseError("Expected level must be between 0.0 and 1.0")
         
         return data
         
     except json.JSONDecodeError as e:
-        raise ParseError(f"Invalid JSON format: {e}")
+        raise ParseError(f"Invalid JSON format: {e}") from e
+    except ParseError:
+        raise
     except Exception as e:
-        raise ParseError(f"Parsing error: {e}")
+        raise ParseError(f"Parsing error: {e}") from e
 
 
 def parse_answer_evaluation(response: str) -> Dict[str, Any]:
@@ -79,50 +127,36 @@ def parse_answer_evaluation(response: str) -> Dict[str, Any]:
     """
     try:
         cleaned = _extract_json_string(response)
-        data = json.loads(cleaned)
+        data = _json_loads(cleaned)
         
-        required_fields = ["quality_score", "reasoning", "strengths", "weaknesses", "level_indication"]
-        for field in required_fields:
-            if field not in data:
-                raise ParseError(f"Missing required field: {field}")
+        missing = _REQ_EVAL - data.keys()
+        if missing:
+            raise ParseError(f"Missing required fields: {sorted(missing)}")
         
-        if not isinstance(data["quality_score"], (int, float)):
+        if type(quality_score := data["quality_score"]) not in (int, float):
             raise ParseError("Quality score must be a number")
         
-        if not isinstance(data["reasoning"], str):
+        if type(data["reasoning"]) is not str:
             raise ParseError("Reasoning must be a string")
         
-        if not isinstance(data["strengths"], list):
+        if type(data["strengths"]) is not list:
             raise ParseError("Strengths must be a list")
         
-        if not isinstance(data["weaknesses"], list):
+        if type(data["weaknesses"]) is not list:
             raise ParseError("Weaknesses must be a list")
         
-        if not isinstance(data["level_indication"], str):
+        if type(level_indication := data["level_indication"]) is not str:
             raise ParseError("Level indication must be a string")
         
-        if not 0.0 <= data["quality_score"] <= 1.0:
+        if not 0.0 <= quality_score <= 1.0:
             raise ParseError("Quality score must be between 0.0 and 1.0")
         
-        valid_levels = ["beginner", "intermediate", "advanced"]
-        level_lower = data["level_indication"].lower().strip()
-        
-        level_mapping = {
-            "beginner": "beginner",
-            "novice": "beginner",
-            "basic": "beginner",
-            "elementary": "beginner",
-            "intermediate": "intermediate",
-            "medium": "intermediate",
-            "moderate": "intermediate",
-            "advanced": "advanced",
-            "expert": "advanced",
-            "proficient": "advanced"
-        }
-        
-        normalized_level = level_mapping.get(level_lower, level_lower)
-        
-        if normalized_level not in valid_levels:
+        normalized_level = _LEVEL_MAPPING.get(level_indication)
+        if normalized_level is None:
+            level_lower = level_indication.lower().strip()
+            normalized_level = _LEVEL_MAPPING.get(level_lower, level_lower)
+        
+        if normalized_level not in _VALID_LEVELS:
             normalized_level = "intermediate"
         
         data["level_indication"] = normalized_level
@@ -130,9 +164,11 @@ def parse_answer_evaluation(response: str) -> Dict[str, Any]:
         return data
         
     except json.JSONDecodeError as e:
-        raise ParseError(f"Invalid JSON format: {e}")
+        raise ParseError(f"Invalid JSON format: {e}") from e
+    except ParseError:
+        raise
     except Exception as e:
-        raise ParseError(f"Parsing error: {e}")
+        raise ParseError(f"Parsing error: {e}") from e
 
 
 def parse_strategy_selection(response: str) -> Dict[str, Any]:
@@ -157,35 +193,39 @@ def parse_strategy_selection(response: str) -> Dict[str, Any]:
     """
     try:
         cleaned = _extract_json_string(response)
-        data = json.loads(cleaned)
+        data = _json_loads(cleaned)
         
-        required_fields = ["chosen_strategy", "reasoning", "confidence"]
-        for field in required_fields:
-            if field not in data:
-                raise ParseError(f"Missing required field: {field}")
+        missing = _REQ_STRAT - data.keys()
+        if missing:
+            raise ParseError(f"Missing required fields: {sorted(missing)}")
         
-        if not isinstance(data["chosen_strategy"], str):
+        if type(chosen_strategy := data["chosen_strategy"]) is not str:
             raise ParseError("Chosen strategy must be a string")
         
-        if not isinstance(data["reasoning"], str):
+        if type(data["reasoning"]) is not str:
             raise ParseError("Reasoning must be a string")
         
-        if not isinstance(data["confidence"], (int, float)):
+        if type(confidence := data["confidence"]) not in (int, float):
             raise ParseError("Confidence must be a number")
         
-        if not 0.0 <= data["confidence"] <= 1.0:
+        if not 0.0 <= confidence <= 1.0:
             raise ParseError("Confidence must be between 0.0 and 1.0")
         
-        valid_strategies = ["direct_explanation", "socratic", "worked_example", "analogy", "visual"]
-        if data["chosen_strategy"] not in valid_strategies:
-            raise ParseError(f"Invalid strategy: {data['chosen_strategy']}. Must be one of: {valid_strategies}")
+        if chosen_strategy not in _VALID_STRATEGIES:
+            raise ParseError(f"Invalid strategy: {chosen_strategy}. Must be one of: {sorted(_VALID_STRATEGIES)}")
+        
+        # Known names only, so later comparisons against the literals can
+        # short-circuit on identity
+        data["chosen_strategy"] = sys.intern(chosen_strategy)
         
         return data
         
     except json.JSONDecodeError as e:
-        raise ParseError(f"Invalid JSON format: {e}")
+        raise ParseError(f"Invalid JSON format: {e}") from e
+    except ParseError:
+        raise
     except Exception as e:
-        raise ParseError(f"Parsing error: {e}")
+        raise ParseError(f"Parsing error: {e}") from e
 
 
 def parse_teaching_response(response: str, strategy_name: str) -> Dict[str, Any]:
@@ -204,36 +244,77 @@ def parse_teaching_response(response: str, strategy_name: str) -> Dict[str, Any]
     """
     try:
         cleaned = _extract_json_string(response)
-        data = json.loads(cleaned)
-        
-        if strategy_name == "direct_explanation":
-            return _parse_direct_explanation(data)
-        elif strategy_name == "socratic":
-            return _parse_socratic(data)
-        elif strategy_name == "worked_example":
-            return _parse_worked_example(data)
-        elif strategy_name == "analogy":
-            return _parse_analogy(data)
-        elif strategy_name == "visual":
-            return _parse_visual(data)
-        else:
-            raise ParseError(f"Unknown strategy: {strategy_name}")
+        data = _json_loads(cleaned)
+        
+        return _parse_strategy_data(data, strategy_name)
             
     except json.JSONDecodeError as e:
-        raise ParseError(f"Invalid JSON format: {e}")
+        raise ParseError(f"Invalid JSON format: {e}") from e
+    except ParseError:
+        raise
     except Exception as e:
-        raise ParseError(f"Parsing error: {e}")
+        raise ParseError(f"Parsing error: {e}") from e
+
+
+def parse_multi_strategy_response(response: str, strategy_names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse a combined teaching response covering several strategies.
+    
+    Expected JSON format:
+    {
+        "strategy_name": {...same fields as the single-strategy response...},
+        ...
+    }
+    
+    Args:
+        response: Raw LLM response string
+        strategy_names: Strategies that must be present in the response
+        
+    Returns:
+        Parsed teaching data keyed by strategy name
+        
+    Raises:
+        ParseError: If parsing fails
+    """
+    try:
+        cleaned = _extract_json_string(response)
+        data = _json_loads(cleaned)
+        
+        parsed = {}
+        for strategy_name in strategy_names:
+            if strategy_name not in data:
+                raise ParseError(f"Missing strategy: {strategy_name}")
+            
+            if type(data[strategy_name]) is not dict:
+                raise ParseError(f"Response for {strategy_name} must be a dictionary")
+            
+            parsed[strategy_name] = _parse_strategy_data(data[strategy_name], strategy_name)
+        
+        return parsed
+        
+    except json.JSONDecodeError as e:
+        raise ParseError(f"Invalid JSON format: {e}") from e
+    except ParseError:
+        raise
+    except Exception as e:
+        raise ParseError(f"Parsing error: {e}") from e
+
+
+def _parse_strategy_data(data: Dict[str, Any], strategy_name: str) -> Dict[str, Any]:
+    """Validate decoded teaching data for a single strategy."""
+    parser = _STRATEGY_DISPATCH.get(strategy_name)
+    if parser is None:
+        raise ParseError(f"Unknown strategy: {strategy_name}")
+    return parser(data)
 
 
 def _parse_direct_explanation(data: Dict[str, Any]) -> Dict[str, Any]:
     """Parse direct explanation response."""
-    required_fields = ["explanation", "key_points", "assessment_question", "expected_answer", "reasoning"]
-    
-    for field in required_fields:
-        if field not in data:
-            raise ParseError(f"Missing required field: {field}")
+    missing = _REQ_DE - data.keys()
+    if missing:
+        raise ParseError(f"Missing required fields: {sorted(missing)}")
     
-    if not isinstance(data["key_points"], list):
+    if type(data["key_points"]) is not list:
         raise ParseError("Key points must be a list")
     
     return data
@@ -241,13 +322,11 @@ def _parse_direct_explanation(data: Dict[str, Any]) -> Dict[str, Any]:
 
 def _parse_socratic(data: Dict[str, Any]) -> Dict[str, Any]:
     """Parse Socratic method response."""
-    required_fields = ["questions", "question_sequence", "assessment_question", "expected_answer", "reasoning"]
+    missing = _REQ_SOC - data.keys()
+    if missing:
+        raise ParseError(f"Missing required fields: {sorted(missing)}")
     
-    for field in required_fields:
-        if field not in data:
-            raise ParseError(f"Missing required field: {field}")
-    
-    if not isinstance(data["questions"], list):
+    if type(data["questions"]) is not list:
         raise ParseError("Questions must be a list")
     
     if len(data["questions"]) < 3:
@@ -258,36 +337,31 @@ def _parse_socratic(data: Dict[str, Any]) -> Dict[str, Any]:
 
 def _parse_worked_example(data: Dict[str, Any]) -> Dict[str, Any]:
     """Parse worked example response."""
-    required_fields = ["problem_statement", "solution_steps", "final_answer", "assessment_question", "expected_answer", "reasoning"]
-    
-    for field in required_fields:
-        if field not in data:
-            raise ParseError(f"Missing required field: {field}")
+    missing = _REQ_WE - data.keys()
+    if missing:
+        raise ParseError(f"Missing required fields: {sorted(missing)}")
     
-    if not isinstance(data["solution_steps"], list):
+    if type(data["solution_steps"]) is not list:
         raise ParseError("Solution steps must be a list")
     
     for i, step in enumerate(data["solution_steps"]):
-        if not isinstance(step, dict):
+        if type(step) is not dict:
             raise ParseError(f"Solution step {i+1} must be a dictionary")
         
-        step_required = ["step", "action", "explanation"]
-        for field in step_required:
-            if field not in step:
-                raise ParseError(f"Solution step {i+1} missing field: {field}")
+        missing = _REQ_STEP - step.keys()
+        if missing:
+            raise ParseError(f"Solution step {i+1} missing fields: {sorted(missing)}")
     
     return data
 
 
 def _parse_analogy(data: Dict[str, Any]) -> Dict[str, Any]:
     """Parse analogy response."""
-    required_fields = ["analogy_concept", "analogy_mapping", "explanation", "limitations", "assessment_question", "expected_answer", "reasoning"]
+    missing = _REQ_ANA - data.keys()
+    if missing:
+        raise ParseError(f"Missing required fields: {sorted(missing)}")
     
-    for field in required_fields:
-        if field not in data:
-            raise ParseError(f"Missing required field: {field}")
-    
-    if not isinstance(data["analogy_mapping"], dict):
+    if type(data["analogy_mapping"]) is not dict:
         raise ParseError("Analogy mapping must be a dictionary")
     
     return data
@@ -295,27 +369,33 @@ def _parse_analogy(data: Dict[str, Any]) -> Dict[str, Any]:
 
 def _parse_visual(data: Dict[str, Any]) -> Dict[str, Any]:
     """Parse visual response."""
-    required_fields = ["visual_type", "visual_description", "key_components", "connections", "assessment_question", "expected_answer", "reasoning"]
-    
-    for field in required_fields:
-        if field not in data:
-            raise ParseError(f"Missing required field: {field}")
+    missing = _REQ_VIS - data.keys()
+    if missing:
+        raise ParseError(f"Missing required fields: {sorted(missing)}")
     
-    if not isinstance(data["key_components"], list):
+    if type(data["key_components"]) is not list:
         raise ParseError("Key components must be a list")
     
     for i, component in enumerate(data["key_components"]):
-        if not isinstance(component, dict):
+        if type(component) is not dict:
             raise ParseError(f"Key component {i+1} must be a dictionary")
         
-        component_required = ["component", "position", "purpose"]
-        for field in component_required:
-            if field not in component:
-                raise ParseError(f"Key component {i+1} missing field: {field}")
+        missing = _REQ_COMP - component.keys()
+        if missing:
+            raise ParseError(f"Key component {i+1} missing fields: {sorted(missing)}")
     
     return data
 
 
+_STRATEGY_DISPATCH = {
+    "direct_explanation": _parse_direct_explanation,
+    "socratic": _parse_socratic,
+    "worked_example": _parse_worked_example,
+    "analogy": _parse_analogy,
+    "visual": _parse_visual
+}
+
+
 def parse_practice_question(response: str) -> Dict[str, Any]:
     """
     Parse practice question response from LLM.
@@ -340,39 +420,38 @@ def parse_practice_question(response: str) -> Dict[str, Any]:
     """
     try:
         cleaned = _extract_json_string(response)
-        data = json.loads(cleaned)
+        data = _json_loads(cleaned)
         
-
-        required_fields = ["question", "expected_answer", "difficulty"]
-        for field in required_fields:
-            if field not in data:
-                raise ParseError(f"Missing required field: {field}")
+        missing = _REQ_PRACTICE - data.keys()
+        if missing:
+            raise ParseError(f"Missing required fields: {sorted(missing)}")
         
-
-        if not isinstance(data["question"], str):
+        if type(data["question"]) is not str:
             raise ParseError("Question must be a string")
         
-        if not isinstance(data["expected_answer"], str):
+        if type(data["expected_answer"]) is not str:
             raise ParseError("Expected answer must be a string")
         
-        if not isinstance(data["difficulty"], (int, float)):
+        if type(difficulty := data["difficulty"]) not in (int, float):
             raise ParseError("Difficulty must be a number")
         
-        if not 0.0 <= data["difficulty"] <= 1.0:
+        if not 0.0 <= difficulty <= 1.0:
             raise ParseError("Difficulty must be between 0.0 and 1.0")
         
-        if "hints" in data and not isinstance(data["hints"], list):
+        if "hints" in data and type(data["hints"]) is not list:
             raise ParseError("Hints must be a list")
         
-        if "reasoning" in data and not isinstance(data["reasoning"], str):
+        if "reasoning" in data and type(data["reasoning"]) is not str:
             raise ParseError("Reasoning must be a string")
         
         return data
         
     except json.JSONDecodeError as e:
-        raise ParseError(f"Invalid JSON format: {e}")
+        raise ParseError(f"Invalid JSON format: {e}") from e
+    except ParseError:
+        raise
     except Exception as e:
-        raise ParseError(f"Parsing error: {e}")
+        raise ParseError(f"Parsing error: {e}") from e
 
 
 def parse_meta_reasoner_decision(response: str) -> Dict[str, Any]:
@@ -400,41 +479,40 @@ def parse_meta_reasoner_decision(response: str) -> Dict[str, Any]:
     """
     try:
         cleaned = _extract_json_string(response)
-        data = json.loads(cleaned)
+        data = _json_loads(cleaned)
         
-        required_fields = ["next_action", "goal_achieved", "needs_prerequisite", "reasoning"]
-        for field in required_fields:
-            if field not in data:
-                raise ParseError(f"Missing required field: {field}")
+        missing = _REQ_META - data.keys()
+        if missing:
+            raise ParseError(f"Missing required fields: {sorted(missing)}")
         
-        if not isinstance(data["next_action"], str):
+        if type(next_action := data["next_action"]) is not str:
             raise ParseError("Next action must be a string")
         
-        if not isinstance(data["goal_achieved"], bool):
+        if type(data["goal_achieved"]) is not bool:
             raise ParseError("Goal achieved must be a boolean")
         
-        if not isinstance(data["needs_prerequisite"], bool):
+        if type(needs_prerequisite := data["needs_prerequisite"]) is not bool:
             raise ParseError("Needs prerequisite must be a boolean")
         
-        if not isinstance(data["reasoning"], str):
+        if type(data["reasoning"]) is not str:
             raise ParseError("Reasoning must be a string")
 
-        valid_actions = ["continue", "end_success", "end_max_attempts", "end_stuck", "prerequisite"]
-        if data["next_action"] not in valid_actions:
-            raise ParseError(f"Next action must be one of: {valid_actions}")
+        if next_action not in _VALID_ACTIONS:
+            raise ParseError(f"Next action must be one of: {sorted(_VALID_ACTIONS)}")
+        data["next_action"] = sys.intern(next_action)
         
-        if data["needs_prerequisite"]:
+        if needs_prerequisite:
             if "prerequisite_topic" not in data:
                 raise ParseError("Prerequisite topic required when needs_prerequisite is True")
-            if not isinstance(data["prerequisite_topic"], str):
+            if type(data["prerequisite_topic"]) is not str:
                 raise ParseError("Prerequisite topic must be a string")
         else:
             data["prerequisite_topic"] = data.get("prerequisite_topic", "")
         
         if "confidence" in data:
-            if not isinstance(data["confidence"], (int, float)):
+            if type(confidence := data["confidence"]) not in (int, float):
                 raise ParseError("Confidence must be a number")
-            if not 0.0 <= data["confidence"] <= 1.0:
+            if not 0.0 <= confidence <= 1.0:
                 raise ParseError("Confidence must be between 0.0 and 1.0")
         else:
             data["confidence"] = 0.7
@@ -442,9 +520,77 @@ def parse_meta_reasoner_decision(response: str) -> Dict[str, Any]:
         return data
         
     except json.JSONDecodeError as e:
-        raise ParseError(f"Invalid JSON format: {e}")
+        raise ParseError(f"Invalid JSON format: {e}") from e
+    except ParseError:
+        raise
     except Exception as e:
-        raise ParseError(f"Parsing error: {e}")
+        raise ParseError(f"Parsing error: {e}") from e
+
+
+def parse_many(parser_func, responses: List[str], *args, **kwargs) -> List[Dict[str, Any]]:
+    """
+    Parse a batch of LLM responses with the same parser.
+    
+    Unlike try_parse, failures are not reported individually; each response
+    that fails to parse is replaced by the parser's fallback data.
+    
+    Args:
+        parser_func: Parser function to use
+        responses: Raw LLM response strings
+        *args, **kwargs: Arguments to pass to parser function
+        
+    Returns:
+        Parsed or fallback data for each response, in order
+    """
+    parser_name = parser_func.__name__
+    results = []
+    append = results.append
+    
+    for response in responses:
+        try:
+            append(parser_func(response, *args, **kwargs))
+        except ParseError:
+            append(_get_fallback_data(parser_name))
+    
+    return results
+
+
+# Data returned in place of a response that could not be parsed
+_FALLBACKS = {
+    "parse_diagnostic_question": {
+        "question": "Can you explain the basic concept?",
+        "expected_level": 0.5,
+        "reasoning": "Fallback question due to parsing error"
+    },
+    "parse_answer_evaluation": {
+        "quality_score": 0.5,
+        "reasoning": "Fallback evaluation due to parsing error",
+        "strengths": ["Attempted to answer"],
+        "weaknesses": ["Unable to evaluate properly"],
+        "level_indication": "intermediate"
+    },
+    "parse_strategy_selection": {
+        "chosen_strategy": "direct_explanation",
+        "reasoning": "Fallback to direct explanation due to parsing error",
+        "confidence": 0.5
+    },
+    "parse_practice_question": {
+        "question": "What did you learn from the explanation?",
+        "expected_answer": "Student should demonstrate understanding",
+        "difficulty": 0.5,
+        "hints": [],
+        "reasoning": "Fallback question due to parsing error"
+    },
+    "parse_meta_reasoner_decision": {
+        "next_action": "continue",
+        "goal_achieved": False,
+        "needs_prerequisite": False,
+        "prerequisite_topic": "",
+        "reasoning": "Fallback decision: continue teaching",
+        "confidence": 0.5
+    }
+}
+_UNKNOWN_PARSER_FALLBACK = {"error": "Unknown parser"}
 
 
 def safe_parse(response: str, parser_func, *args, **kwargs) -> Dict[str, Any]:
@@ -459,55 +605,36 @@ def safe_parse(response: str, parser_func, *args, **kwargs) -> Dict[str, Any]:
     Returns:
         Parsed data or fallback data if parsing fails
     """
+    data, _ = try_parse(response, parser_func, *args, **kwargs)
+    return data
+
+
+def try_parse(response: str, parser_func, *args, **kwargs) -> Tuple[Dict[str, Any], bool]:
+    """
+    Parse LLM response once, reporting whether the fallback was used.
+    
+    Args:
+        response: Raw LLM response string
+        parser_func: Parser function to use
+        *args, **kwargs: Arguments to pass to parser function
+        
+    Returns:
+        Tuple of (parsed or fallback data, True if parsing succeeded)
+    """
     try:
-        return parser_func(response, *args, **kwargs)
+        return parser_func(response, *args, **kwargs), True
     except ParseError as e:
-        print(f"⚠️  Parse error: {e}")
-        return _get_fallback_data(parser_func.__name__)
+        logger.warning("Parse error: %s", e)
+        return _get_fallback_data(parser_func.__name__), False
     except Exception as e:
-        print(f"⚠️  Unexpected error: {e}")
-        return _get_fallback_data(parser_func.__name__)
+        logger.warning("Unexpected error: %s", e)
+        return _get_fallback_data(parser_func.__name__), False
 
 
 def _get_fallback_data(parser_name: str) -> Dict[str, Any]:
     """Get fallback data when parsing fails."""
-    
-    fallbacks = {
-        "parse_diagnostic_question": {
-            "question": "Can you explain the basic concept?",
-            "expected_level": 0.5,
-            "reasoning": "Fallback question due to parsing error"
-        },
-        "parse_answer_evaluation": {
-            "quality_score": 0.5,
-            "reasoning": "Fallback evaluation due to parsing error",
-            "strengths": ["Attempted to answer"],
-            "weaknesses": ["Unable to evaluate properly"],
-            "level_indication": "intermediate"
-        },
-        "parse_strategy_selection": {
-            "chosen_strategy": "direct_explanation",
-            "reasoning": "Fallback to direct explanation due to parsing error",
-            "confidence": 0.5
-        },
-        "parse_practice_question": {
-            "question": "What did you learn from the explanation?",
-            "expected_answer": "Student should demonstrate understanding",
-            "difficulty": 0.5,
-            "hints": [],
-            "reasoning": "Fallback question due to parsing error"
-        },
-        "parse_meta_reasoner_decision": {
-            "next_action": "continue",
-            "goal_achieved": False,
-            "needs_prerequisite": False,
-            "prerequisite_topic": "",
-            "reasoning": "Fallback decision: continue teaching",
-            "confidence": 0.5
-        }
-    }
-    
-    return fallbacks.get(parser_name, {"error": "Unknown parser"})
+    # Deep copy so callers can update nested lists (hints, strengths, ...) safely
+    return copy.deepcopy(_FALLBACKS.get(parser_name, _UNKNOWN_PARSER_FALLBACK))
 
 
 def _extract_json_string(text: str) -> str:
@@ -517,16 +644,17 @@ def _extract_json_string(text: str) -> str:
     if not isinstance(text, str):
         raise ParseError("Response is not a string")
 
+    # Clean JSON is the common case; check its ends before copying anything
+    if text[:1] == "{" and text[-1:] == "}":
+        return text
+
     stripped = text.strip()
     if stripped.startswith("{") and stripped.endswith("}"):
         return stripped
 
     if "```" in stripped:
-        parts = stripped.split("```")
-        for i in range(1, len(parts), 2):
-            block = parts[i]
-            block = re.sub(r"^\s*json\s*\n", "", block, flags=re.IGNORECASE)
-            candidate = block.strip()
+        for match in _FENCE_RE.finditer(stripped):
+            candidate = match.group(1).strip()
             if candidate.startswith("{") and candidate.endswith("}"):
                 return candidate
 
@@ -536,4 +664,6 @@ def _extract_json_string(text: str) -> str:
         candidate = stripped[start:end + 1].strip()
         return candidate
 
-    return stripped
+    # No closing brace after an opening one (e.g. a truncated or partial
+    # response), so there is nothing worth handing to the JSON decoder
+    raise ParseError("Response does not contain a complete JSON object")
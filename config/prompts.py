@@ -1,3 +1,14 @@
+__all__ = [
+    "DIAGNOTIC_PROMPT",
+    "ANSWER_EVALUATION_PROMPT",
+    "STRATEGY_PROMPTS",
+    "MULTI_STRATEGY_PROMPT",
+    "PRACTICE_QUESTION_PROMPT",
+    "STRATEGY_SELECTION_PROMPT",
+    "META_REASONER_PROMPT"
+]
+
+
 DIAGNOTIC_PROMPT = """
 
 You are an adaptive diagnostic agent. Generate the NEXT diagnostic question.
@@ -53,13 +64,12 @@ Return JSON format:
 # ============================================================================
 # STRATEGY TEACHING PROMPTS (JSON Format)
 # ============================================================================
+# Topic and student level go at the end of each prompt so the static
+# instructions form a stable prefix that provider-side prompt caches can reuse.
 
 STRATEGY_PROMPTS = {
     "direct_explanation": """You are a teaching expert using the Direct Explanation strategy.
 
-Topic: {topic}
-Student Level: {student_level:.2f}/1.0
-
 Provide a clear, structured explanation using the Direct Explanation approach.
 
 Return JSON format:
@@ -69,12 +79,12 @@ Return JSON format:
     "assessment_question": "Question to test understanding",
     "expected_answer": "What a good answer should include",
     "reasoning": "Why this approach works for this topic"
-}}""",
-
-    "socratic": """You are a teaching expert using the Socratic Method.
+}}
 
 Topic: {topic}
-Student Level: {student_level:.2f}/1.0
+Student Level: {student_level:.2f}/1.0""",
+
+    "socratic": """You are a teaching expert using the Socratic Method.
 
 Guide understanding through thoughtful questions that build on each other.
 
@@ -90,12 +100,12 @@ Return JSON format:
     "assessment_question": "Final question to test understanding",
     "expected_answer": "What a good answer should include",
     "reasoning": "Why this Socratic approach works for this topic"
-}}""",
-
-    "worked_example": """You are a teaching expert using the Worked Example strategy.
+}}
 
 Topic: {topic}
-Student Level: {student_level:.2f}/1.0
+Student Level: {student_level:.2f}/1.0""",
+
+    "worked_example": """You are a teaching expert using the Worked Example strategy.
 
 Demonstrate step-by-step problem solving with a concrete example.
 
@@ -112,12 +122,12 @@ Return JSON format:
     "assessment_question": "Question to test if student can apply the method",
     "expected_answer": "What a good answer should include",
     "reasoning": "Why this worked example approach works for this topic"
-}}""",
-
-    "analogy": """You are a teaching expert using the Analogy strategy.
+}}
 
 Topic: {topic}
-Student Level: {student_level:.2f}/1.0
+Student Level: {student_level:.2f}/1.0""",
+
+    "analogy": """You are a teaching expert using the Analogy strategy.
 
 Explain using a relatable real-world analogy that maps key features clearly.
 
@@ -134,12 +144,12 @@ Return JSON format:
     "assessment_question": "Question to test understanding",
     "expected_answer": "What a good answer should include",
     "reasoning": "Why this analogy approach works for this topic"
-}}""",
-
-    "visual": """You are a teaching expert using the Visual strategy.
+}}
 
 Topic: {topic}
-Student Level: {student_level:.2f}/1.0
+Student Level: {student_level:.2f}/1.0""",
+
+    "visual": """You are a teaching expert using the Visual strategy.
 
 Create a visual representation using diagrams, flowcharts, or spatial descriptions.
 
@@ -157,9 +167,27 @@ Return JSON format:
     "assessment_question": "Question to test visual understanding",
     "expected_answer": "What a good answer should include",
     "reasoning": "Why this visual approach works for this topic"
-}}"""
+}}
+
+Topic: {topic}
+Student Level: {student_level:.2f}/1.0"""
 }
 
+# ============================================================================
+# MULTI-STRATEGY TEACHING PROMPT
+# ============================================================================
+
+MULTI_STRATEGY_PROMPT = """You are a teaching expert preparing content for several teaching strategies at once.
+
+For EACH strategy section below, follow its instructions and produce the JSON object it describes.
+
+{strategy_sections}
+
+Return a single JSON object keyed by strategy name ({strategy_names}), where each value is that strategy's JSON object:
+{{
+    "strategy_name": {{"...": "fields required by that strategy"}}
+}}"""
+
 # ============================================================================
 # PRACTICE QUESTION PROMPT
 # ============================================================================
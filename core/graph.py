@@ -1,74 +1,83 @@
+import asyncio
+import functools
 from typing import Dict, Any, Literal
 from langgraph.graph import StateGraph, END
 
 from core.state import AgentState
-from agents.diagnostic import adaptive_diagnostic_node, MIN_DIAGNOSTIC_CONFIDENCE, MAX_DIAGNOSTIC_QUESTIONS
-from agents.strategy_selector import strategy_selector_node
-from agents.teach_node import teach_node
-from agents.practice_node import practice_node
-from agents.evaluate_node import evaluate_node
-from agents.meta_reasoner_node import meta_reasoner_node
 
 
 def diagnostic_phase_node(state: AgentState) -> Dict[str, Any]:
     """
-    Wrapper node that handles the diagnostic loop internally.
+    Ask one adaptive diagnostic question per visit.
     
-    Calls adaptive_diagnostic_node repeatedly until diagnostic is complete
-    (confidence >= threshold or max questions reached).
+    route_diagnostic sends the graph back to this node until the diagnostic
+    is complete (confidence >= threshold or max questions reached); the
+    visit that completes it also sets current_proficiency from the estimate.
     
     Args:
         state: Current agent state
         
     Returns:
-        State updates including diagnostic completion status
+        State updates for this question, plus completion status when done
     """
     
     print("\n" + "="*60)
     print("Diagnostic Phase Node")
     print("="*60)
     
-    working_state = dict(state)
+    confidence = state.diagnostic_confidence
+    num_questions = len(state.diagnostic_questions)
+    updates = {}
     
-    confidence = working_state.get("diagnostic_confidence", 0.0)
-    num_questions = len(working_state.get("diagnostic_questions", []))
-    
-    if confidence >= MIN_DIAGNOSTIC_CONFIDENCE:
-        print(f"\nDiagnostic complete (confidence: {confidence:.2f})")
-        estimated_level = working_state.get("estimated_level", 0.2)
-        return {
-            "current_proficiency": estimated_level,
-            "decision_log": working_state.get("decision_log", []) + [
-                f"Diagnostic complete: {num_questions} questions, confidence {confidence:.2f}"
-            ]
-        }
-    
-    print(f"\nRunning diagnostic assessment...")
-    
-    while confidence < MIN_DIAGNOSTIC_CONFIDENCE and num_questions < MAX_DIAGNOSTIC_QUESTIONS:
-        updates = adaptive_diagnostic_node(working_state)
-        working_state.update(updates)
+    if not _diagnostic_complete(confidence, num_questions):
+        from agents.diagnostic import adaptive_diagnostic_node
+        
+        print(f"\nRunning diagnostic assessment...")
+        
+        updates = adaptive_diagnostic_node(state)
         
-        confidence = working_state.get("diagnostic_confidence", 0.0)
-        num_questions = len(working_state.get("diagnostic_questions", []))
+        confidence = updates.get("diagnostic_confidence", confidence)
+        num_questions += len(updates.get("diagnostic_questions", ()))
+        
+        if not _diagnostic_complete(confidence, num_questions):
+            return updates
     
-    estimated_level = working_state.get("estimated_level", 0.2)
+    estimated_level = updates.get("estimated_level", state.estimated_level)
     
     print(f"\nDiagnostic complete.")
     print(f"   Questions asked: {num_questions}")
     print(f"   Confidence: {confidence:.2f}")
     print(f"   Estimated Level: {estimated_level:.2f}")
     
-    return {
-        "diagnostic_confidence": working_state.get("diagnostic_confidence", 0.0),
-        "diagnostic_questions": working_state.get("diagnostic_questions", []),
-        "diagnostic_answers": working_state.get("diagnostic_answers", []),
-        "estimated_level": estimated_level,
-        "current_proficiency": estimated_level,
-        "decision_log": working_state.get("decision_log", []) + [
-            f"Diagnostic complete: {num_questions} questions, confidence {confidence:.2f}, level {estimated_level:.2f}"
-        ]
-    }
+    updates["current_proficiency"] = estimated_level
+    updates["decision_log"] = updates.get("decision_log", []) + [
+        f"Diagnostic complete: {num_questions} questions, confidence {confidence:.2f}, level {estimated_level:.2f}"
+    ]
+    
+    return updates
+
+
+def route_diagnostic(state: AgentState) -> Literal["loop", "done"]:
+    """
+    Conditional routing function for the diagnostic phase.
+    
+    Args:
+        state: Current agent state
+        
+    Returns:
+        "loop" to ask another question, "done" to move on to strategy selection
+    """
+    
+    confidence = state.diagnostic_confidence
+    num_questions = len(state.diagnostic_questions)
+    
+    return "done" if _diagnostic_complete(confidence, num_questions) else "loop"
+
+
+def _diagnostic_complete(confidence: float, num_questions: int) -> bool:
+    from agents.diagnostic import MIN_DIAGNOSTIC_CONFIDENCE, MAX_DIAGNOSTIC_QUESTIONS
+    
+    return confidence >= MIN_DIAGNOSTIC_CONFIDENCE or num_questions >= MAX_DIAGNOSTIC_QUESTIONS
 
 
 def route_decision(state: AgentState) -> str:
@@ -86,48 +95,93 @@ def route_decision(state: AgentState) -> str:
         String key that maps to next node or END
     """
     
-    next_action = state.get("next_action", "continue")
-    goal_achieved = state.get("goal_achieved", False)
-    current_attempt = state.get("current_attempt", 0)
-    max_attempts = state.get("max_attempts", 10)
+    next_action = state.next_action
+    current_attempt = state.current_attempt
+    max_attempts = state.max_attempts
     
-    print(f"\nRouting Decision:")
-    print(f"   Next Action: {next_action}")
-    print(f"   Goal Achieved: {goal_achieved}")
-    print(f"   Attempt: {current_attempt}/{max_attempts}")
+    # Stop at max attempts or once the goal is achieved, even if the
+    # meta-reasoner says continue
+    if next_action == "continue" and current_attempt < max_attempts and not state.goal_achieved:
+        route = "strategy_selector"
+    else:
+        route = "end"
     
-    # Safety check: stop if max attempts reached, even if meta-reasoner says continue
-    if current_attempt >= max_attempts:
-        print(f"   Max attempts reached! Forcing end.")
-        return "end"
+    _print_route(state, route)
     
-    # Safety check: stop if goal achieved, even if meta-reasoner says continue
-    if goal_achieved:
-        print(f"   Goal achieved! Forcing end.")
-        return "end"
+    return route
+
+
+def _print_route(state: AgentState, route: str):
+    current_attempt = state.current_attempt
+    max_attempts = state.max_attempts
+    goal_achieved = state.goal_achieved
+    
+    lines = [
+        f"\nRouting Decision:",
+        f"   Next Action: {state.next_action}",
+        f"   Goal Achieved: {goal_achieved}",
+        f"   Attempt: {current_attempt}/{max_attempts}"
+    ]
     
-    if next_action == "continue" and not goal_achieved:
-        print(f"   Routing to: strategy_selector (continue teaching)")
-        return "strategy_selector"
+    if current_attempt >= max_attempts:
+        lines.append(f"   Max attempts reached! Forcing end.")
+    elif goal_achieved:
+        lines.append(f"   Goal achieved! Forcing end.")
+    elif route == "strategy_selector":
+        lines.append(f"   Routing to: strategy_selector (continue teaching)")
     else:
-        print(f"   Routing to: END")
-        return "end"
+        lines.append(f"   Routing to: END")
+    
+    print("\n".join(lines))
 
 
-def build_teaching_graph():
+def build_teaching_graph(checkpointer=None):
     """
     Build and compile the complete teaching agent workflow graph.
     
+    The topology is static, so the uncompiled workflow is built once and
+    the checkpointer-less graph is compiled once and shared. A graph with a
+    checkpointer is compiled per call, since each run owns its checkpointer
+    and closes it when the run ends.
+    
     Graph Structure:
     START → diagnostic_phase → strategy_selector → teach → practice → evaluate → meta_reasoner → route_decision
                                                                                                         ↓
                                                                                     [continue → strategy_selector]
                                                                                     [end_* → END]
     
+    diagnostic_phase loops back to itself (route_diagnostic) until the
+    diagnostic is complete.
+    
+    Args:
+        checkpointer: Optional LangGraph checkpointer that persists state
+            after every super-step so interrupted runs can resume
+    
     Returns:
         Compiled LangGraph workflow
     """
     
+    if checkpointer is None:
+        return _default_teaching_graph()
+    
+    return _teaching_workflow().compile(checkpointer=checkpointer)
+
+
+@functools.lru_cache(maxsize=1)
+def _default_teaching_graph():
+    return _teaching_workflow().compile()
+
+
+@functools.lru_cache(maxsize=1)
+def _teaching_workflow() -> StateGraph:
+    # Agent nodes pull in the LLM client stack, so they are imported here
+    # rather than when core.graph is loaded
+    from agents.strategy_selector import strategy_selector_node
+    from agents.teach_node import teach_node
+    from agents.practice_node import practice_node
+    from agents.evaluate_node import evaluate_node
+    from agents.meta_reasoner_node import meta_reasoner_node
+    
     workflow = StateGraph(AgentState)
     
     workflow.add_node("diagnostic_phase", diagnostic_phase_node)
@@ -138,7 +192,14 @@ def build_teaching_graph():
     workflow.add_node("meta_reasoner", meta_reasoner_node)
     
     workflow.set_entry_point("diagnostic_phase")
-    workflow.add_edge("diagnostic_phase", "strategy_selector")
+    workflow.add_conditional_edges(
+        "diagnostic_phase",
+        route_diagnostic,
+        {
+            "loop": "diagnostic_phase",
+            "done": "strategy_selector"
+        }
+    )
     workflow.add_edge("strategy_selector", "teach")
     workflow.add_edge("teach", "practice")
     workflow.add_edge("practice", "evaluate")
@@ -153,9 +214,7 @@ def build_teaching_graph():
         }
     )
     
-    app = workflow.compile()
-    
-    return app
+    return workflow
 
 
 def run_teaching_workflow(initial_state: AgentState) -> AgentState:
@@ -171,7 +230,8 @@ def run_teaching_workflow(initial_state: AgentState) -> AgentState:
     
     graph = build_teaching_graph()
     
-    final_state = graph.invoke(initial_state)
+    # teach_node is async, so the graph has to run on the async executor
+    final_state = asyncio.run(graph.ainvoke(initial_state))
     
     return final_state
 
@@ -1,14 +1,16 @@
-from langgraph.graph import StateGraph
-from typing import TypedDict, List, Dict, Literal, Any
-from pydantic import BaseModel, Field
+import operator
+from dataclasses import dataclass, field
+from typing import Annotated, List, Dict, Any, Tuple
 
 
-class TeachingStrategy(TypedDict):
+@dataclass(slots=True, frozen=True)
+class TeachingStrategy:
     name: str
     description: str
     effectiveness: float
 
-class LearningSession(TypedDict):
+@dataclass(slots=True, frozen=True)
+class LearningSession:
     session_id: int
     topic: str
     strategy: str
@@ -19,62 +21,84 @@ class LearningSession(TypedDict):
     feedback: str
     score: float 
     timestamp: str
-
-class AgentState(TypedDict):
+    student_level: float = 0.0  # Proficiency the session was taught at
+
+@dataclass(slots=True, frozen=True)
+class CurrentTeaching:
+    strategy: str = ""  # Strategy chosen for the session in progress
+    explanation: str = ""  # Current teaching explanation
+    data: Dict[str, Any] = field(default_factory=dict)  # Full teaching data from teach_node
+    question: str = ""  # Current practice question
+    correct_answer: str = ""  # Expected answer for current question
+    user_answer: str = ""  # Student's answer to current question
+    difficulty: float = 0.5  # Difficulty level of current question
+
+def merge_running_stats(
+    left: Dict[str, Tuple[float, int]], right: Dict[str, Tuple[float, int]]
+) -> Dict[str, Tuple[float, int]]:
+    """
+    Reducer for strategy_running_stats: adds each new (score total, count)
+    pair onto the strategy's running totals.
+    """
+    merged = dict(left)
+    for strategy, (total, count) in right.items():
+        prev_total, prev_count = merged.get(strategy, (0.0, 0))
+        merged[strategy] = (prev_total + total, prev_count + count)
+    return merged
+
+# Nodes return partial dicts of updates; LangGraph merges them into the state
+@dataclass(slots=True)
+class AgentState:
     # input 
     topic: str
-    target_score: float 
+    target_score: float = 0.6
 
     # diagnotics
-    diagnostic_confidence: float
-    diagnostic_questions: List[str]
-    diagnostic_answers: List[str]
-    estimated_level: float
+    diagnostic_confidence: float = 0.0
+    diagnostic_questions: Annotated[List[str], operator.add] = field(default_factory=list)  # Nodes return only new questions
+    diagnostic_answers: Annotated[List[str], operator.add] = field(default_factory=list)  # Nodes return only new answers
+    estimated_level: float = 0.2
     
     # Legacy/deprecated (kept for compatibility)
-    current_level: float
-    current_confidence: float
-    current_questions: List[str]
-    current_answers: List[str]
+    current_level: float = 0.0
+    current_confidence: float = 0.0
+    current_questions: Annotated[List[str], operator.add] = field(default_factory=list)
+    current_answers: Annotated[List[str], operator.add] = field(default_factory=list)
 
     # goal
 
-    learning_goal: str
-    current_proficiency: float
+    learning_goal: str = ""
+    current_proficiency: float = 0.0
 
     # strategy
 
-    current_strategy: str
-    available_strategies: List[TeachingStrategy]
-    strategy_attempts: Dict[str, int]
-    consecutive_failures: int
-    target_proficiency: float
+    available_strategies: List[TeachingStrategy] = field(default_factory=list)
+    strategy_attempts: Dict[str, int] = field(default_factory=dict)
+    probe_all_strategies: bool = False  # Generate content for every strategy in one LLM call
+    consecutive_failures: int = 0
+    target_proficiency: float = 0.6
 
     # session history
 
-    sessions: List[LearningSession]
+    sessions: Annotated[List[LearningSession], operator.add] = field(default_factory=list)  # Nodes return only new sessions
+    strategy_running_stats: Annotated[Dict[str, Tuple[float, int]], merge_running_stats] = field(default_factory=dict)  # (score total, count) per strategy
 
-    # teaching/practice state
-    current_explanation: str  # Current teaching explanation
-    current_question: str  # Current practice question
-    current_correct_answer: str  # Expected answer for current question
-    current_user_answer: str  # Student's answer to current question
-    current_question_difficulty: float  # Difficulty level of current question
-    current_teaching_data: Dict[str, Any]  # Full teaching data from teach_node
+    # teaching/practice state, written as one channel
+    current: CurrentTeaching = field(default_factory=CurrentTeaching)
         
     # Meta-reasoning
-    stuck_counter: int  # How many times tried without progress
-    needs_prerequisite: bool
-    prerequisite_topic: str
+    stuck_counter: int = 0  # How many times tried without progress
+    needs_prerequisite: bool = False
+    prerequisite_topic: str = ""
     
     # Agent decisions (audit trail)
-    decision_log: List[str]
+    decision_log: Annotated[List[str], operator.add] = field(default_factory=list)  # Nodes return only new entries
     
     # Control flow
-    next_action: str  # What agent decided to do next
-    goal_achieved: bool
-    max_attempts: int
-    current_attempt: int
+    next_action: str = "diagnose"  # What agent decided to do next
+    goal_achieved: bool = False
+    max_attempts: int = 10
+    current_attempt: int = 0
 
 
 def create_initial_state(topic: str) -> AgentState:
@@ -83,42 +107,5 @@ def create_initial_state(topic: str) -> AgentState:
     """
     return AgentState(
         topic=topic,
-        target_score=0.6,
-        diagnostic_confidence=0.0,
-        diagnostic_questions=[],
-        diagnostic_answers=[],
-        estimated_level=0.2,
-        current_level=0.0,
-        current_confidence=0.0,
-        current_questions=[],
-        current_answers=[],
-        learning_goal=f"Master {topic}",
-        current_proficiency=0.0,
-        current_strategy="",
-        available_strategies=[],
-        strategy_attempts={},
-        consecutive_failures=0,
-        target_proficiency=0.6,
-        sessions=[],
-        stuck_counter=0,
-        needs_prerequisite=False,
-        prerequisite_topic="",
-        decision_log=[],
-        next_action="diagnose",
-        goal_achieved=False,
-        max_attempts=10,
-        current_attempt=0,
-        current_explanation="",
-        current_question="",
-        current_correct_answer="",
-        current_user_answer="",
-        current_question_difficulty=0.5,
-        current_teaching_data={}
+        learning_goal=f"Master {topic}"
     )
-
-
-
-
-
-
-
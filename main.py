@@ -1,34 +1,56 @@
-from agents.strategies import get_default_strategies
+import argparse
+import asyncio
+import uuid
+from typing import Optional
+
+from agents.strategies import DEFAULT_STRATEGIES, DEFAULT_STRATEGY_ATTEMPTS, track_session_effectiveness
 from core.state import create_initial_state
 from core.graph import build_teaching_graph
 
 
-def main():
+# Per-step workflow state is saved here when langgraph-checkpoint-sqlite is installed
+CHECKPOINT_DB = "metatutor_state.db"
+
+# State classes stored in checkpoints. The serializer only rebuilds
+# registered types when a run is resumed.
+CHECKPOINT_STATE_TYPES = [
+    ("core.state", "TeachingStrategy"),
+    ("core.state", "LearningSession"),
+    ("core.state", "CurrentTeaching")
+]
+
+
+def main(resume_run_id: Optional[str] = None):
     print("="*80)
     print("METATUTOR: Adaptive Learning System")
     print("="*80)
     
-    topic = input("\nEnter a topic to learn (e.g., 'binary search', 'Bayes theorem'): ").strip()
-    if not topic:
-        print("Topic is required. Exiting.")
-        return
+    if resume_run_id:
+        final_state = asyncio.run(_run_workflow(None, resume_run_id))
+        if final_state is None:
+            return
+        topic = final_state["topic"]
+    else:
+        topic = input("\nEnter a topic to learn (e.g., 'binary search', 'Bayes theorem'): ").strip()
+        if not topic:
+            print("Topic is required. Exiting.")
+            return
 
-    state = create_initial_state(topic)
-    state["available_strategies"] = get_default_strategies()
-    state["strategy_attempts"] = {s["name"]: 0 for s in state["available_strategies"]}
-    
-    print(f"\nLearning Goal: Master {topic}")
-    print(f"Target Proficiency: {state['target_proficiency']:.1f}")
-    print(f"Max Attempts: {state['max_attempts']}")
-    
-    print(f"\n" + "="*60)
-    print(f"Starting LangGraph Workflow")
-    print("="*60)
-    
-    graph = build_teaching_graph()
-    
-    print(f"\nExecuting workflow...")
-    final_state = graph.invoke(state, config={"recursion_limit": 500})
+        state = create_initial_state(topic)
+        state.available_strategies = list(DEFAULT_STRATEGIES)
+        state.strategy_attempts = dict(DEFAULT_STRATEGY_ATTEMPTS)
+        
+        print(f"\nLearning Goal: Master {topic}")
+        print(f"Target Proficiency: {state.target_proficiency:.1f}")
+        print(f"Max Attempts: {state.max_attempts}")
+        
+        print(f"\n" + "="*60)
+        print(f"Starting LangGraph Workflow")
+        print("="*60)
+        
+        print(f"\nExecuting workflow...")
+        # LangGraph hands back the final channel values as a plain dict
+        final_state = asyncio.run(_run_workflow(state, uuid.uuid4().hex[:8]))
     
     next_action = final_state.get("next_action", "unknown")
     goal_achieved = final_state.get("goal_achieved", False)
@@ -55,39 +77,126 @@ def main():
     
     state = final_state
     
-    print(f"\n" + "="*80)
-    print(f"LEARNING SESSION SUMMARY")
-    print("="*80)
+    lines = [
+        f"\n" + "="*80,
+        f"LEARNING SESSION SUMMARY",
+        "="*80,
+        f"\nTopic: {topic}",
+        f"Final Proficiency: {state.get('current_proficiency', 0.0):.2f}",
+        f"Target Proficiency: {state.get('target_proficiency', 0.8):.2f}",
+        f"Sessions Completed: {len(state.get('sessions', []))}",
+        f"Total Attempts: {state.get('current_attempt', 0)}",
+        f"\nStrategy Performance:"
+    ]
+    
+    # (score total, count) per strategy, accumulated by the nodes as sessions complete
+    strategy_stats = state.get("strategy_running_stats", {})
+    lines.extend(
+        f"   {strategy:20s}: {total / count:.2f} (used {count} times)"
+        for strategy, (total, count) in strategy_stats.items()
+    )
+    
+    lines.append(f"\nAgent Decision Log:")
+    decision_log = state.get("decision_log", [])
+    lines.extend(f"   {i:2d}. {decision}" for i, decision in enumerate(decision_log, 1))
+    
+    # One write for the whole summary instead of a print per line
+    print("\n".join(lines))
     
-    print(f"\nTopic: {topic}")
-    print(f"Final Proficiency: {state.get('current_proficiency', 0.0):.2f}")
-    print(f"Target Proficiency: {state.get('target_proficiency', 0.8):.2f}")
-    print(f"Sessions Completed: {len(state.get('sessions', []))}")
-    print(f"Total Attempts: {state.get('current_attempt', 0)}")
-    
-    print(f"\nStrategy Performance:")
-    sessions = state.get("sessions", [])
-    if sessions:
-        strategy_scores = {}
-        for session in sessions:
-            strategy = session["strategy"]
-            score = session["score"]
-            if strategy not in strategy_scores:
-                strategy_scores[strategy] = []
-            strategy_scores[strategy].append(score)
+    from agents.strategies import effectiveness_tracker
+    # Nothing was tracked if the run ended before the first session
+    if effectiveness_tracker.session_history:
+        filename = effectiveness_tracker.export_data()
+        print(f"\nEffectiveness data exported to: {filename}")
+
+
+async def _run_workflow(state, run_id: str):
+    """
+    Run the teaching graph, checkpointing every super-step to CHECKPOINT_DB
+    under run_id when the SQLite checkpointer is available.
+    
+    Args:
+        state: Initial state for a new run, or None to resume the
+            interrupted run saved under run_id
+        run_id: Checkpoint thread for this run
+    
+    Returns:
+        Final state values, or None if there was no run to resume
+    """
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError:
+        if state is None:
+            print("\nResuming requires the langgraph-checkpoint-sqlite package.")
+            return None
+        graph = build_teaching_graph()
+        return await _stream_graph(graph, state, {"recursion_limit": 500})
+    
+    config = {"configurable": {"thread_id": run_id}, "recursion_limit": 500}
+    
+    serde = JsonPlusSerializer(allowed_msgpack_modules=CHECKPOINT_STATE_TYPES)
+    
+    async with aiosqlite.connect(CHECKPOINT_DB) as conn:
+        checkpointer = AsyncSqliteSaver(conn, serde=serde)
+        graph = build_teaching_graph(checkpointer)
+        
+        if state is None:
+            snapshot = await graph.aget_state(config)
+            if not snapshot.next:
+                print(f"\nNo interrupted run with ID '{run_id}' to resume.")
+                return None
+            
+            print(f"\nResuming interrupted session for '{snapshot.values['topic']}'...")
+            _restore_effectiveness_tracker(snapshot.values.get("sessions", []))
+            final_state = await _stream_graph(graph, None, config)
+        else:
+            print(f"\nRun ID: {run_id} (if interrupted, resume with: python main.py --resume {run_id})")
+            final_state = await _stream_graph(graph, state, config)
         
-        for strategy, scores in strategy_scores.items():
-            avg_score = sum(scores) / len(scores)
-            print(f"   {strategy:20s}: {avg_score:.2f} (used {len(scores)} times)")
+        # Only interrupted runs need to be resumable
+        await checkpointer.adelete_thread(run_id)
+    
+    return final_state
+
+
+def _restore_effectiveness_tracker(sessions):
+    # The tracker lives in memory only, so replay the checkpointed sessions
+    # to give a resumed run the same history and export as an uninterrupted one
+    for session in sessions:
+        track_session_effectiveness(session.strategy, session.score, session.topic, session.student_level)
 
-    print(f"\nAgent Decision Log:")
-    for i, decision in enumerate(state.get("decision_log", []), 1):
-        print(f"   {i:2d}. {decision}")
+
+async def _stream_graph(graph, graph_input, config):
+    """
+    Run the graph while reporting each node's decisions as soon as the node
+    finishes, and return the final state.
+    """
+    final_state = None
     
-    from agents.strategies import effectiveness_tracker
-    filename = effectiveness_tracker.export_data()
-    print(f"\nEffectiveness data exported to: {filename}")
+    async for mode, chunk in graph.astream(graph_input, config=config, stream_mode=["updates", "values"]):
+        if mode == "values":
+            final_state = chunk
+        else:
+            _render_updates(chunk)
+    
+    return final_state
+
+
+def _render_updates(chunk):
+    lines = [
+        f"   [{node}] {decision}"
+        for node, update in chunk.items() if update
+        for decision in update.get("decision_log", [])
+    ]
+    if lines:
+        print("\n".join(lines))
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="MetaTutor adaptive learning system")
+    parser.add_argument("--resume", metavar="RUN_ID", help="resume the interrupted run with this ID")
+    args = parser.parse_args()
+    
+    main(args.resume)
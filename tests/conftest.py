@@ -0,0 +1,59 @@
+import pytest
+
+import tools.llm
+
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeChatClient:
+    """Stands in for ChatGoogleGenerativeAI and records every prompt sent."""
+
+    def __init__(self):
+        self.prompts = []
+        self.batch_configs = []
+
+    def _reply(self, prompt: str) -> FakeMessage:
+        self.prompts.append(prompt)
+        return FakeMessage(f"reply {len(self.prompts)}")
+
+    def invoke(self, prompt):
+        return self._reply(prompt)
+
+    async def ainvoke(self, prompt):
+        return self._reply(prompt)
+
+    def batch(self, prompts, config=None):
+        self.batch_configs.append(config)
+        return [self._reply(prompt) for prompt in prompts]
+
+    def stream(self, prompt):
+        text = self._reply(prompt).content
+        yield FakeMessage(text[:3])
+        yield FakeMessage(text[3:])
+
+    async def astream(self, prompt):
+        text = self._reply(prompt).content
+        yield FakeMessage(text[:3])
+        yield FakeMessage(text[3:])
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    """An LLM() built in a test talks to a FakeChatClient instead of Gemini."""
+    client = FakeChatClient()
+    monkeypatch.setattr(tools.llm, "_make_client", lambda model, api_key: client)
+    return client
+
+
+@pytest.fixture
+def response_cache(monkeypatch, tmp_path):
+    """Turn on the METATUTOR_LLM_CACHE store, backed by a temporary file."""
+    monkeypatch.setattr(tools.llm, "RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(tools.llm, "RESPONSE_CACHE_FILE", str(tmp_path / "llm_cache"))
+    monkeypatch.setattr(tools.llm, "_response_cache", None)
+    yield
+    if tools.llm._response_cache is not None:
+        tools.llm._response_cache.close()
@@ -0,0 +1,165 @@
+import asyncio
+
+import pytest
+
+import tools.llm
+from tools.llm import LLM, _TRUNCATION_MARKER, _truncate_middle
+
+
+def _collect(async_iterator):
+    async def consume():
+        return [chunk async for chunk in async_iterator]
+    return asyncio.run(consume())
+
+
+# _truncate_middle
+
+def test_short_prompt_is_unchanged():
+    assert _truncate_middle("instructions\n\nformat", 100) == "instructions\n\nformat"
+
+
+def test_middle_paragraphs_are_dropped_first():
+    prompt = "\n\n".join(["INSTRUCTIONS"] + ["history " * 50] * 20 + ["FORMAT"])
+    
+    result = _truncate_middle(prompt, 100)
+    
+    assert len(result) <= 400
+    assert result.startswith("INSTRUCTIONS")
+    assert result.endswith("FORMAT")
+    assert _TRUNCATION_MARKER in result
+
+
+def test_prompt_without_paragraph_breaks_keeps_both_ends():
+    prompt = "S" + "x" * 1000 + "E"
+    
+    result = _truncate_middle(prompt, 50)
+    
+    assert len(result) <= 200
+    assert result.startswith("S")
+    assert result.endswith("E")
+    assert _TRUNCATION_MARKER in result
+
+
+def test_oversized_first_paragraph_is_trimmed_not_dropped():
+    prompt = "I" * 1000 + "\n\nmiddle\n\nFORMAT"
+    
+    result = _truncate_middle(prompt, 50)
+    
+    assert len(result) <= 200
+    assert result.startswith("I")
+    assert result.endswith("FORMAT")
+
+
+# Every LLM entry point sends the truncated prompt
+
+@pytest.mark.parametrize("method", ["invoke", "ainvoke", "batch", "stream", "astream"])
+def test_every_entry_point_truncates(fake_client, method):
+    llm = LLM()
+    prompt = "INSTRUCTIONS\n\n" + "history\n\n" * 500 + "FORMAT"
+    
+    if method == "invoke":
+        llm.invoke(prompt, max_tokens_in=50)
+    elif method == "ainvoke":
+        asyncio.run(llm.ainvoke(prompt, max_tokens_in=50))
+    elif method == "batch":
+        llm.batch([prompt], max_tokens_in=50)
+    elif method == "stream":
+        list(llm.stream(prompt, max_tokens_in=50))
+    else:
+        _collect(llm.astream(prompt, max_tokens_in=50))
+    
+    assert fake_client.prompts == [_truncate_middle(prompt, 50)]
+
+
+# batch and stream
+
+def test_batch_returns_responses_in_prompt_order(fake_client):
+    results = LLM().batch(["first", "second", "third"])
+    
+    assert results == ["reply 1", "reply 2", "reply 3"]
+    assert fake_client.prompts == ["first", "second", "third"]
+    assert fake_client.batch_configs == [{"max_concurrency": tools.llm.BATCH_MAX_CONCURRENCY}]
+
+
+def test_empty_batch_makes_no_request(fake_client):
+    assert LLM().batch([]) == []
+    assert fake_client.batch_configs == []
+
+
+def test_stream_yields_chunks_as_they_arrive(fake_client):
+    assert list(LLM().stream("explain")) == ["rep", "ly 1"]
+
+
+# Response cache (METATUTOR_LLM_CACHE)
+
+def _call(llm, method, prompt, **kwargs):
+    if method == "invoke":
+        return llm.invoke(prompt, **kwargs)
+    if method == "ainvoke":
+        return asyncio.run(llm.ainvoke(prompt, **kwargs))
+    if method == "batch":
+        return llm.batch([prompt], **kwargs)[0]
+    if method == "stream":
+        return "".join(llm.stream(prompt, **kwargs))
+    return "".join(_collect(llm.astream(prompt, **kwargs)))
+
+
+@pytest.mark.parametrize("method", ["invoke", "ainvoke", "batch", "stream", "astream"])
+def test_repeated_prompt_is_served_from_cache(fake_client, response_cache, method):
+    llm = LLM()
+    
+    first = _call(llm, method, "what is binary search?")
+    llm.commit(first)
+    second = _call(llm, method, "what is binary search?")
+    
+    assert first == second == "reply 1"
+    assert len(fake_client.prompts) == 1
+
+
+def test_all_entry_points_share_cache_keys(fake_client, response_cache):
+    llm = LLM()
+    prompt = "INSTRUCTIONS\n\n" + "history\n\n" * 500 + "FORMAT"
+    
+    answer = "".join(_collect(llm.astream(prompt, max_tokens_in=50)))
+    llm.commit(answer)
+    
+    for method in ["invoke", "ainvoke", "batch", "stream"]:
+        assert _call(llm, method, prompt, max_tokens_in=50) == answer
+    assert len(fake_client.prompts) == 1
+
+
+def test_batch_only_sends_uncached_prompts(fake_client, response_cache):
+    llm = LLM()
+    llm.commit(llm.invoke("cached"))
+    
+    results = llm.batch(["new one", "cached", "new two"])
+    
+    assert results == ["reply 2", "reply 1", "reply 3"]
+    assert fake_client.prompts == ["cached", "new one", "new two"]
+
+
+def test_disabled_cache_always_calls_the_model(fake_client, monkeypatch):
+    monkeypatch.setattr(tools.llm, "RESPONSE_CACHE_ENABLED", False)
+    llm = LLM()
+    
+    llm.invoke("same prompt")
+    llm.invoke("same prompt")
+    
+    assert len(fake_client.prompts) == 2
+
+
+@pytest.mark.parametrize("method", ["invoke", "ainvoke", "batch", "stream", "astream"])
+def test_uncommitted_response_is_not_cached(fake_client, response_cache, method):
+    _call(LLM(), method, "what is binary search?")
+    
+    assert _call(LLM(), method, "what is binary search?") == "reply 2"
+    assert len(fake_client.prompts) == 2
+
+
+def test_commit_only_persists_the_given_response(fake_client, response_cache):
+    llm = LLM()
+    good, bad = llm.batch(["parses", "does not parse"])
+    llm.commit(good)
+    
+    assert LLM().batch(["parses", "does not parse"]) == [good, "reply 3"]
+    assert fake_client.prompts == ["parses", "does not parse", "does not parse"]
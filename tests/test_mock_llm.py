@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+import tools.llm
+from agents import diagnostic
+from config.parsers import (
+    parse_answer_evaluation,
+    parse_diagnostic_question,
+    parse_meta_reasoner_decision,
+    parse_practice_question,
+    parse_strategy_selection,
+    parse_teaching_response,
+)
+from config.prompts import (
+    ANSWER_EVALUATION_PROMPT,
+    DIAGNOTIC_PROMPT,
+    META_REASONER_PROMPT,
+    PRACTICE_QUESTION_PROMPT,
+    STRATEGY_PROMPTS,
+    STRATEGY_SELECTION_PROMPT,
+)
+from tools.llm import LLM, MockLLM, get_llm
+
+
+# get_llm
+
+def test_get_llm_defaults_to_the_real_model(fake_client, monkeypatch):
+    monkeypatch.setattr(tools.llm, "MOCK_LLM_ENABLED", False)
+    
+    assert type(get_llm()) is LLM
+
+
+def test_mock_llm_setting_switches_the_default(monkeypatch):
+    monkeypatch.setattr(tools.llm, "MOCK_LLM_ENABLED", True)
+    
+    assert isinstance(get_llm(), MockLLM)
+
+
+def test_explicit_use_mock_overrides_the_setting(fake_client, monkeypatch):
+    monkeypatch.setattr(tools.llm, "MOCK_LLM_ENABLED", True)
+    
+    assert type(get_llm(use_mock=False)) is LLM
+    assert isinstance(get_llm(use_mock=True), MockLLM)
+
+
+# MockLLM canned responses
+
+@pytest.mark.parametrize("prompt, parser", [
+    (DIAGNOTIC_PROMPT, parse_diagnostic_question),
+    (ANSWER_EVALUATION_PROMPT, parse_answer_evaluation),
+    (PRACTICE_QUESTION_PROMPT, parse_practice_question),
+    (STRATEGY_SELECTION_PROMPT, parse_strategy_selection),
+    (META_REASONER_PROMPT, parse_meta_reasoner_decision),
+])
+def test_canned_response_matches_its_parser(prompt, parser):
+    parser(MockLLM().invoke(prompt))
+
+
+@pytest.mark.parametrize("strategy_name", list(STRATEGY_PROMPTS))
+def test_canned_teaching_response_matches_its_strategy(strategy_name):
+    parse_teaching_response(MockLLM().invoke(STRATEGY_PROMPTS[strategy_name]), strategy_name)
+
+
+def test_mock_entry_points_return_the_same_response():
+    llm = MockLLM()
+    expected = llm.invoke(META_REASONER_PROMPT)
+    
+    async def consume():
+        return [chunk async for chunk in llm.astream(META_REASONER_PROMPT)]
+    
+    assert asyncio.run(llm.ainvoke(META_REASONER_PROMPT)) == expected
+    assert "".join(llm.stream(META_REASONER_PROMPT)) == expected
+    assert "".join(asyncio.run(consume())) == expected
+    assert llm.batch([META_REASONER_PROMPT, DIAGNOTIC_PROMPT]) == [expected, llm.invoke(DIAGNOTIC_PROMPT)]
+
+
+# Diagnostics go through get_llm like the other agents
+
+def test_diagnostic_evaluation_uses_mock_setting(monkeypatch):
+    monkeypatch.setattr(tools.llm, "MOCK_LLM_ENABLED", True)
+    
+    evaluation = diagnostic.evaluate_answer_quality("What is it?", "An answer", 0.5, "binary search")
+    
+    assert evaluation["reasoning"] == "Mock evaluation"
+    assert evaluation["quality_score"] == 0.6
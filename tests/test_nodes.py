@@ -0,0 +1,104 @@
+import asyncio
+from collections import OrderedDict
+
+import pytest
+
+import agents.meta_reasoner_node
+import agents.teach_node
+import agents.teaching_content
+from agents.meta_reasoner_node import meta_reasoner_node
+from agents.teach_node import teach_node
+from config.prompts import STRATEGY_PROMPTS
+from core.state import create_initial_state
+from tools.llm import MockLLM
+
+
+class CountingLLM:
+    """Returns one fixed response, counting calls and recording commits."""
+
+    def __init__(self, response: str):
+        self.response = response
+        self.calls = 0
+        self.committed = []
+
+    async def ainvoke(self, prompt: str) -> str:
+        self.calls += 1
+        return self.response
+
+    async def astream(self, prompt: str):
+        self.calls += 1
+        yield self.response
+
+    def commit(self, response: str):
+        self.committed.append(response)
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    def install(module, response):
+        fake = CountingLLM(response)
+        monkeypatch.setattr(module, "get_llm", lambda: fake)
+        return fake
+    return install
+
+
+# meta_reasoner_node
+
+def test_meta_reasoner_uses_parsed_decision(llm):
+    response = MockLLM().invoke("analyzing the overall learning progress")
+    fake = llm(agents.meta_reasoner_node, response)
+    
+    update = asyncio.run(meta_reasoner_node(create_initial_state("binary search")))
+    
+    assert fake.calls == 1
+    assert fake.committed == [response]
+    assert update["next_action"] == "continue"
+    assert "Mock decision" in update["decision_log"][0]
+
+
+def test_meta_reasoner_falls_back_on_unparseable_response(llm):
+    fake = llm(agents.meta_reasoner_node, "not json")
+    
+    update = asyncio.run(meta_reasoner_node(create_initial_state("binary search")))
+    
+    assert fake.calls == 1
+    assert fake.committed == []
+    assert update["next_action"] == "continue"
+    assert "Fallback decision" in update["decision_log"][0]
+
+
+# teach_node
+
+@pytest.fixture(autouse=True)
+def empty_teaching_cache(monkeypatch):
+    monkeypatch.setattr(agents.teach_node, "_teaching_cache", OrderedDict())
+
+
+def test_teach_node_commits_parsed_response(llm):
+    response = MockLLM().invoke(STRATEGY_PROMPTS["direct_explanation"])
+    fake = llm(agents.teach_node, response)
+    
+    update = asyncio.run(teach_node(create_initial_state("binary search")))
+    
+    assert fake.committed == [response]
+    assert update["current"].explanation == "A clear explanation of the concept"
+
+
+def test_teach_node_does_not_commit_unparseable_response(llm):
+    fake = llm(agents.teach_node, "{\"explanation\": \"cut off")
+    
+    asyncio.run(teach_node(create_initial_state("binary search")))
+    
+    assert fake.calls == 1
+    assert fake.committed == []
+
+
+def test_teach_node_shows_the_lesson_without_a_terminal(llm, capsys, monkeypatch):
+    monkeypatch.setattr(agents.teaching_content, "VERBOSE", False)
+    llm(agents.teach_node, MockLLM().invoke(STRATEGY_PROMPTS["direct_explanation"]))
+    
+    asyncio.run(teach_node(create_initial_state("binary search")))
+    
+    output = capsys.readouterr().out
+    assert "Teaching Content (direct_explanation):" in output
+    assert "A clear explanation of the concept" in output
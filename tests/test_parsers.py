@@ -0,0 +1,149 @@
+import json
+
+import pytest
+
+import config.parsers
+from config.parsers import (
+    ParseError,
+    parse_answer_evaluation,
+    parse_diagnostic_question,
+    parse_many,
+    parse_meta_reasoner_decision,
+    parse_practice_question,
+    parse_strategy_selection,
+    parse_teaching_response,
+    try_parse,
+)
+
+
+PRACTICE_RESPONSE = json.dumps({
+    "question": "What is the midpoint of [0, 10]?",
+    "expected_answer": "5",
+    "difficulty": 0.4,
+    "hints": ["Add the ends", "Halve the sum"],
+    "reasoning": "Checks the core step"
+})
+
+DIRECT_EXPLANATION_RESPONSE = json.dumps({
+    "explanation": "Binary search halves the range each step",
+    "key_points": ["Sorted input", "Halve the range"],
+    "assessment_question": "Why must the input be sorted?",
+    "expected_answer": "So each comparison rules out half",
+    "reasoning": "Core idea first"
+})
+
+
+# Responses that are not strings
+
+@pytest.mark.parametrize("parser", [
+    parse_diagnostic_question,
+    parse_answer_evaluation,
+    parse_strategy_selection,
+    parse_practice_question,
+    parse_meta_reasoner_decision,
+])
+def test_non_string_response_raises_parse_error(parser):
+    with pytest.raises(ParseError):
+        parser([{"type": "text", "text": "{}"}])
+
+
+def test_non_string_teaching_response_raises_parse_error():
+    with pytest.raises(ParseError):
+        parse_teaching_response([{"type": "text"}], "direct_explanation")
+
+
+def test_try_parse_falls_back_on_non_string_response():
+    data, parsed = try_parse([{"type": "text"}], parse_practice_question)
+    
+    assert not parsed
+    assert "question" in data
+
+
+# One decode and one set of checks per response
+
+PARSER_CASES = [
+    (parse_diagnostic_question, json.dumps({"question": "What is it?", "expected_level": 1, "reasoning": "Probe"}), ()),
+    (parse_answer_evaluation, json.dumps({
+        "quality_score": 0.7, "reasoning": "Good", "strengths": [], "weaknesses": [], "level_indication": " Expert"
+    }), ()),
+    (parse_strategy_selection, json.dumps({"chosen_strategy": "visual", "reasoning": "Try it", "confidence": 0.6}), ()),
+    (parse_practice_question, PRACTICE_RESPONSE, ()),
+    (parse_meta_reasoner_decision, json.dumps({
+        "next_action": "continue", "goal_achieved": False, "needs_prerequisite": False, "reasoning": "Keep going"
+    }), ()),
+    (parse_teaching_response, DIRECT_EXPLANATION_RESPONSE, ("direct_explanation",)),
+]
+
+
+@pytest.mark.parametrize("parser, response, args", PARSER_CASES)
+def test_each_response_is_decoded_once(parser, response, args, monkeypatch):
+    decoded = []
+    loads = config.parsers._json_loads
+    monkeypatch.setattr(config.parsers, "_json_loads", lambda text: decoded.append(text) or loads(text))
+    
+    parser(response, *args)
+    
+    assert len(decoded) == 1
+
+
+@pytest.mark.parametrize("parser, args", [(parser, args) for parser, _, args in PARSER_CASES])
+def test_failed_checks_decode_once_too(parser, args, monkeypatch):
+    decoded = []
+    loads = config.parsers._json_loads
+    monkeypatch.setattr(config.parsers, "_json_loads", lambda text: decoded.append(text) or loads(text))
+    
+    with pytest.raises(ParseError):
+        parser("{}", *args)
+    
+    assert len(decoded) == 1
+
+
+def test_optional_practice_fields_are_not_invented():
+    data = parse_practice_question(json.dumps({"question": "Why?", "expected_answer": "So", "difficulty": 0.2}))
+    
+    assert "hints" not in data
+    assert "reasoning" not in data
+
+
+def test_meta_reasoner_defaults_are_filled_in():
+    data = parse_meta_reasoner_decision(json.dumps({
+        "next_action": "end_stuck", "goal_achieved": False, "needs_prerequisite": False, "reasoning": "Stuck"
+    }))
+    
+    assert data["prerequisite_topic"] == ""
+    assert data["confidence"] == 0.7
+
+
+def test_evaluation_level_is_normalized():
+    data = parse_answer_evaluation(json.dumps({
+        "quality_score": 0.3, "reasoning": "Partial", "strengths": [], "weaknesses": [], "level_indication": "Novice"
+    }))
+    
+    assert data["level_indication"] == "beginner"
+
+
+# parse_many
+
+def test_parse_many_keeps_order_and_falls_back_per_response():
+    results = parse_many(parse_practice_question, [PRACTICE_RESPONSE, "not json", PRACTICE_RESPONSE])
+    
+    assert results[0] == results[2] == json.loads(PRACTICE_RESPONSE)
+    assert results[1] == try_parse("not json", parse_practice_question)[0]
+
+
+def test_parse_many_passes_extra_arguments_to_the_parser():
+    results = parse_many(parse_teaching_response, [DIRECT_EXPLANATION_RESPONSE, "{}"], "direct_explanation")
+    
+    assert results[0] == json.loads(DIRECT_EXPLANATION_RESPONSE)
+    assert results[1] == try_parse("{}", parse_teaching_response, "direct_explanation")[0]
+
+
+# Fallback data
+
+def test_mutating_fallback_lists_does_not_change_later_fallbacks():
+    first, _ = try_parse("not json", parse_answer_evaluation)
+    first["weaknesses"].append("Injected")
+    
+    second, _ = try_parse("not json", parse_answer_evaluation)
+    
+    assert "Injected" not in second["weaknesses"]
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+
+import pytest
+
+pytest.importorskip("langgraph.checkpoint.sqlite.aio")
+
+import agents.strategies
+import main
+import tools.llm
+from agents.strategies import DEFAULT_STRATEGIES, DEFAULT_STRATEGY_ATTEMPTS, StrategyEffectivenessTracker
+from core.state import LearningSession, create_initial_state
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def offline_run(monkeypatch, tmp_path):
+    """Run the real graph against MockLLM with a fresh checkpoint database and tracker."""
+    monkeypatch.setattr(main, "CHECKPOINT_DB", str(tmp_path / "state.db"))
+    monkeypatch.setattr(tools.llm, "MOCK_LLM_ENABLED", True)
+    tracker = StrategyEffectivenessTracker()
+    monkeypatch.setattr(agents.strategies, "effectiveness_tracker", tracker)
+    return tracker
+
+
+def _initial_state():
+    state = create_initial_state("binary search")
+    state.available_strategies = list(DEFAULT_STRATEGIES)
+    state.strategy_attempts = dict(DEFAULT_STRATEGY_ATTEMPTS)
+    return state
+
+
+def test_interrupted_run_resumes_from_its_checkpoint(offline_run, monkeypatch, caplog):
+    practice_questions = 0
+    
+    def input_interrupting_second_practice(prompt=""):
+        nonlocal practice_questions
+        if prompt == "   ":
+            practice_questions += 1
+            if practice_questions == 2:
+                raise Interrupted
+        return "An answer"
+    
+    monkeypatch.setattr("builtins.input", input_interrupting_second_practice)
+    with pytest.raises(Interrupted):
+        asyncio.run(main._run_workflow(_initial_state(), "run1"))
+    
+    assert len(offline_run.session_history) == 1
+    
+    # A resume starts in a new process, with an empty tracker
+    resumed_tracker = StrategyEffectivenessTracker()
+    monkeypatch.setattr(agents.strategies, "effectiveness_tracker", resumed_tracker)
+    monkeypatch.setattr("builtins.input", lambda prompt="": "An answer")
+    with caplog.at_level(logging.WARNING):
+        final_state = asyncio.run(main._run_workflow(None, "run1"))
+    
+    assert final_state is not None
+    assert final_state["next_action"] != "continue"
+    assert "unregistered" not in caplog.text
+    assert all(isinstance(session, LearningSession) for session in final_state["sessions"])
+    # The checkpointed session is replayed into the tracker, so it matches an
+    # uninterrupted run
+    assert len(resumed_tracker.session_history) == len(final_state["sessions"])
+
+
+def test_finished_run_cannot_be_resumed(offline_run, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda prompt="": "An answer")
+    asyncio.run(main._run_workflow(_initial_state(), "run2"))
+    
+    assert asyncio.run(main._run_workflow(None, "run2")) is None
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from agents.strategies import DEFAULT_STRATEGIES
+from agents.teaching_content import process_teaching_data, stream_llm_text
+from config.parsers import parse_teaching_response
+from config.prompts import STRATEGY_PROMPTS
+from tools.llm import MockLLM
+
+
+@pytest.mark.parametrize("strategy_name", [strategy.name for strategy in DEFAULT_STRATEGIES])
+def test_every_strategy_has_its_own_summary(strategy_name):
+    teaching_data = parse_teaching_response(MockLLM().invoke(STRATEGY_PROMPTS[strategy_name]), strategy_name)
+    
+    explanation, display_text = process_teaching_data(strategy_name, teaching_data)
+    
+    assert explanation != "Teaching content provided"
+    assert display_text.startswith(f"\nTeaching Content ({strategy_name}):")
+
+
+def test_display_block_is_skipped_when_not_shown():
+    teaching_data = {"explanation": "Binary search halves the range", "key_points": ["sorted input"]}
+    
+    assert process_teaching_data("direct_explanation", teaching_data, display=False) == (
+        "Binary search halves the range", ""
+    )
+
+
+def test_unknown_strategy_gets_generic_summary():
+    assert process_teaching_data("unknown", {}, display=False) == ("Teaching content provided", "")
+
+
+def test_stream_llm_text_joins_the_streamed_chunks():
+    prompt = STRATEGY_PROMPTS["socratic"]
+    
+    assert asyncio.run(stream_llm_text(MockLLM(), prompt)) == MockLLM().invoke(prompt)
@@ -1,11 +1,17 @@
+import atexit
+import functools
+import hashlib
 import json
 import os
-from typing import Dict, Any, Optional
+import shelve
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Any, Iterator, List, Optional, Tuple
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 load_dotenv()
 
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
 
 
 langsmith_api_key = os.getenv("LANGCHAIN_API_KEY")
@@ -15,35 +21,351 @@ if langsmith_api_key:
 else:
     os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
 
+# Read once at import; LLM() is constructed for every node call
+_GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+# Upper bound on requests LLM.batch keeps in flight at once
+BATCH_MAX_CONCURRENCY = 8
+
+# With METATUTOR_LLM_CACHE=1, responses the caller commits (see LLM.commit)
+# are persisted here and identical (model, prompt) pairs are answered
+# without an API call
+RESPONSE_CACHE_ENABLED = os.environ.get("METATUTOR_LLM_CACHE") == "1"
+RESPONSE_CACHE_FILE = ".llm_cache"
+
+_response_cache = None
+
+
+def _get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = shelve.open(RESPONSE_CACHE_FILE)
+        # Flush and close the store on interpreter exit so writes aren't lost
+        atexit.register(_response_cache.close)
+    return _response_cache
+
+
+def _response_cache_key(model: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}|{prompt}".encode()).hexdigest()
+
+
+def _store_response(key: str, text: str):
+    _get_response_cache()[key] = text
+
+
+def _message_text(message) -> str:
+    return message.content if hasattr(message, 'content') else str(message)
+
+
+# Prompts estimated above this many input tokens lose their middle before
+# being sent. The estimate is character based (about 4 characters per token)
+# so checking it needs no tokenizer or count_tokens round trip.
+MAX_PROMPT_TOKENS = 8000
+_CHARS_PER_TOKEN = 4
+
+_TRUNCATION_MARKER = "[... content omitted ...]"
+
+
+def _truncate_middle(prompt: str, max_tokens_in: int) -> str:
+    """
+    Drop paragraphs from the middle of an over-long prompt. The first
+    paragraph (instructions) and the last (output format) are always kept,
+    cut down by characters only if the two alone exceed the limit.
+    """
+    max_chars = max_tokens_in * _CHARS_PER_TOKEN
+    if len(prompt) <= max_chars:
+        return prompt
+    
+    paragraphs = prompt.split("\n\n")
+    if len(paragraphs) == 1:
+        # No paragraph breaks: keep the start and end of the single block
+        first = last = prompt
+        middle = []
+    else:
+        first, middle, last = paragraphs[0], paragraphs[1:-1], paragraphs[-1]
+    
+    # Room left once the marker and the two separators around it are counted
+    budget = max(max_chars - len(_TRUNCATION_MARKER) - 4, 0)
+    
+    last_share = min(len(last), budget // 2)
+    first_share = min(len(first), budget - last_share)
+    last_share = min(len(last), budget - first_share)
+    budget -= first_share + last_share
+    
+    head = [first[:first_share]]
+    tail = [last[len(last) - last_share:]]
+    
+    # Fill the remaining room with middle paragraphs, alternately from each end
+    while middle:
+        side = head if len(head) <= len(tail) else tail
+        paragraph = middle.pop(0) if side is head else middle.pop()
+        cost = len(paragraph) + 2
+        if cost > budget:
+            break
+        budget -= cost
+        side.append(paragraph)
+    
+    return "\n\n".join(head + [_TRUNCATION_MARKER] + tail[::-1])
+
+
+@functools.lru_cache(maxsize=4)
+def _make_client(model: str, api_key: Optional[str]) -> "ChatGoogleGenerativeAI":
+    # Nodes build a new LLM per call; sharing the client keeps its HTTP
+    # connections alive across calls instead of reconnecting each time.
+    # The LangChain/Gemini SDK import is deferred to the first client so
+    # modules that never call the LLM don't pay for it.
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    
+    return ChatGoogleGenerativeAI(
+        model=model,
+        api_key=api_key
+    )
+
 
 class LLM:
-    """LLM wrapper that uses real or mock implementation."""
+    """LLM wrapper around the Gemini chat model; see MockLLM for offline use."""
 
-    def __init__(self, model: str = "gemini-2.5-flash", api_key: Optional[str] = None, use_mock: bool = False):
+    def __init__(self, model: str = DEFAULT_MODEL, api_key: Optional[str] = None):
         self.model = model
 
-        self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
-        self.client = ChatGoogleGenerativeAI(
-            model=model,    
-            api_key=self.api_key
-        )
+        self.api_key = api_key or _GOOGLE_API_KEY
+        self.client = _make_client(model, self.api_key)
+        
+        # Fresh responses held back from the response cache until commit(),
+        # keyed by cache key
+        self._uncommitted: Dict[str, str] = {}
+        
+    def _cached_call(self, prompt: str, max_tokens_in: int) -> Tuple[str, Optional[str], Optional[str]]:
+        """
+        Prepare a prompt for any entry point: truncate it, then look the
+        truncated prompt up in the response cache.
+        
+        Returns:
+            Tuple of (prompt to send, cache key or None when caching is off,
+            cached response or None on a miss)
+        """
+        prompt = _truncate_middle(prompt, max_tokens_in)
+        if not RESPONSE_CACHE_ENABLED:
+            return prompt, None, None
+        
+        key = _response_cache_key(self.model, prompt)
+        return prompt, key, _get_response_cache().get(key)
+
+    def _hold_response(self, key: Optional[str], text: str):
+        if key is not None:
+            self._uncommitted[key] = text
+
+    def commit(self, response: str):
+        """
+        Persist a response this instance returned to the response cache.
+        
+        Callers commit once the response has parsed, so a truncated or
+        malformed response is never replayed on later runs. Responses that
+        are never committed are simply dropped.
+        """
+        for key, text in list(self._uncommitted.items()):
+            if text == response:
+                _store_response(key, text)
+                del self._uncommitted[key]
+
+    def invoke(self, prompt: str, max_tokens_in: int = MAX_PROMPT_TOKENS) -> str:
+        prompt, key, cached = self._cached_call(prompt, max_tokens_in)
+        if cached is not None:
+            return cached
+        
+        text = _message_text(self.client.invoke(prompt))
+        self._hold_response(key, text)
+        return text
+
+    def batch(self, prompts: List[str], max_tokens_in: int = MAX_PROMPT_TOKENS) -> List[str]:
+        """
+        Send several independent prompts concurrently and return the
+        responses in prompt order. Cached prompts are not resent.
+        """
+        prepared = [self._cached_call(prompt, max_tokens_in) for prompt in prompts]
+        results = [cached for _, _, cached in prepared]
+        misses = [i for i, cached in enumerate(results) if cached is None]
+        
+        if misses:
+            responses = self.client.batch(
+                [prepared[i][0] for i in misses],
+                config={"max_concurrency": BATCH_MAX_CONCURRENCY}
+            )
+            for i, response in zip(misses, responses):
+                results[i] = _message_text(response)
+                self._hold_response(prepared[i][1], results[i])
+        
+        return results
+
+    async def ainvoke(self, prompt: str, max_tokens_in: int = MAX_PROMPT_TOKENS) -> str:
+        prompt, key, cached = self._cached_call(prompt, max_tokens_in)
+        if cached is not None:
+            return cached
+        
+        text = _message_text(await self.client.ainvoke(prompt))
+        self._hold_response(key, text)
+        return text
+
+    def stream(self, prompt: str, max_tokens_in: int = MAX_PROMPT_TOKENS) -> Iterator[str]:
+        # A cache hit replays the whole stored response as a single chunk
+        prompt, key, cached = self._cached_call(prompt, max_tokens_in)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        for chunk in self.client.stream(prompt):
+            text = _message_text(chunk)
+            chunks.append(text)
+            yield text
+        
+        self._hold_response(key, "".join(chunks))
+
+    async def astream(self, prompt: str, max_tokens_in: int = MAX_PROMPT_TOKENS) -> AsyncIterator[str]:
+        prompt, key, cached = self._cached_call(prompt, max_tokens_in)
+        if cached is not None:
+            yield cached
+            return
         
-    def invoke(self, prompt: str) -> str:
-        response = self.client.invoke(prompt)
-        if hasattr(response, 'content'):
-            return response.content
-        else:
-            return str(response)
+        chunks = []
+        async for chunk in self.client.astream(prompt):
+            text = _message_text(chunk)
+            chunks.append(text)
+            yield text
+        
+        self._hold_response(key, "".join(chunks))
+
+
+# With METATUTOR_MOCK_LLM=1, get_llm() hands every node a MockLLM so the whole
+# app runs offline
+MOCK_LLM_ENABLED = os.environ.get("METATUTOR_MOCK_LLM") == "1"
+
+# Canned responses for MockLLM, matched by a phrase unique to each prompt in
+# config/prompts.py. Each one satisfies the parser for that prompt. The
+# multi-strategy prompt embeds the single-strategy ones, so it gets a single
+# strategy's content back and teach_node falls back to one strategy per call.
+_MOCK_RESPONSES = tuple((marker, json.dumps(data)) for marker, data in (
+    ("adaptive diagnostic agent", {
+        "question": "Can you explain the basic idea in your own words?",
+        "expected_level": 0.5,
+        "reasoning": "Mock diagnostic question"
+    }),
+    ("expert evaluator", {
+        "quality_score": 0.6,
+        "reasoning": "Mock evaluation",
+        "strengths": ["Attempted to answer"],
+        "weaknesses": ["Could add more detail"],
+        "level_indication": "intermediate"
+    }),
+    ("Generate practice questions", {
+        "question": "How would you apply the concept to a simple example?",
+        "expected_answer": "A correct application of the concept",
+        "difficulty": 0.5,
+        "hints": ["Start from the definition"],
+        "reasoning": "Mock practice question"
+    }),
+    ("decide which teaching strategy", {
+        "chosen_strategy": "direct_explanation",
+        "reasoning": "Mock strategy selection",
+        "confidence": 0.7
+    }),
+    ("analyzing the overall learning progress", {
+        "next_action": "continue",
+        "goal_achieved": False,
+        "needs_prerequisite": False,
+        "prerequisite_topic": "",
+        "reasoning": "Mock decision: continue teaching",
+        "confidence": 0.7
+    }),
+    ("Socratic Method", {
+        "questions": ["What do you already know?", "What changes if the input grows?", "Why does that work?"],
+        "question_sequence": "From prior knowledge to the key insight",
+        "assessment_question": "What is the key insight?",
+        "expected_answer": "The key insight of the concept",
+        "reasoning": "Mock socratic content"
+    }),
+    ("Worked Example strategy", {
+        "problem_statement": "Apply the concept to a small example",
+        "solution_steps": [
+            {"step": 1, "action": "Set up the problem", "explanation": "Identify the inputs"},
+            {"step": 2, "action": "Apply the concept", "explanation": "Follow the definition"}
+        ],
+        "final_answer": "The worked result",
+        "assessment_question": "What was the second step?",
+        "expected_answer": "Apply the concept",
+        "reasoning": "Mock worked example"
+    }),
+    ("Analogy strategy", {
+        "analogy_concept": "Looking up a word in a dictionary",
+        "analogy_mapping": {"concept": "dictionary lookup"},
+        "explanation": "The concept works like a dictionary lookup",
+        "limitations": "The analogy ignores edge cases",
+        "assessment_question": "How does the analogy map to the concept?",
+        "expected_answer": "Each part of the concept maps to part of the lookup",
+        "reasoning": "Mock analogy"
+    }),
+    ("Visual strategy", {
+        "visual_type": "flowchart",
+        "visual_description": "Input flows through the concept to an output",
+        "key_components": [{"component": "input", "position": "left", "purpose": "data in"}],
+        "connections": "Input connects to output",
+        "assessment_question": "What does the flowchart start with?",
+        "expected_answer": "The input",
+        "reasoning": "Mock visual"
+    }),
+    ("Direct Explanation strategy", {
+        "explanation": "A clear explanation of the concept",
+        "key_points": ["Definition", "How it works", "When to use it"],
+        "assessment_question": "What is the concept?",
+        "expected_answer": "A correct definition of the concept",
+        "reasoning": "Mock direct explanation"
+    }),
+))
+_MOCK_DEFAULT_RESPONSE = "{}"
+
+
+class MockLLM:
+    """
+    Offline stand-in for LLM with the same methods. Returns canned JSON for
+    each prompt in config/prompts.py without any network access.
+    """
+
+    model = "mock"
+
+    def invoke(self, prompt: str, max_tokens_in: int = MAX_PROMPT_TOKENS) -> str:
+        for marker, response in _MOCK_RESPONSES:
+            if marker in prompt:
+                return response
+        return _MOCK_DEFAULT_RESPONSE
+
+    def batch(self, prompts: List[str], max_tokens_in: int = MAX_PROMPT_TOKENS) -> List[str]:
+        return [self.invoke(prompt) for prompt in prompts]
+
+    async def ainvoke(self, prompt: str, max_tokens_in: int = MAX_PROMPT_TOKENS) -> str:
+        return self.invoke(prompt)
+
+    def stream(self, prompt: str, max_tokens_in: int = MAX_PROMPT_TOKENS) -> Iterator[str]:
+        yield self.invoke(prompt)
+
+    async def astream(self, prompt: str, max_tokens_in: int = MAX_PROMPT_TOKENS) -> AsyncIterator[str]:
+        yield self.invoke(prompt)
+
+    def commit(self, response: str):
+        pass
 
 
-def get_llm(use_mock: bool = True) -> LLM:
+def get_llm(use_mock: Optional[bool] = None):
     """
     Get LLM instance.
     
     Args:
-        use_mock: Whether to use mock LLM (default True for testing)
+        use_mock: Whether to use the offline MockLLM; defaults to the
+            METATUTOR_MOCK_LLM setting
     
     Returns:
-        LLM instance
+        MockLLM if use_mock is set, otherwise a Gemini-backed LLM
     """
-    return LLM(use_mock=use_mock)
\ No newline at end of file
+    if use_mock is None:
+        use_mock = MOCK_LLM_ENABLED
+    return MockLLM() if use_mock else LLM()
@@ -1,4 +1,10 @@
 import logging
+import os
+import sys
 
 # Configure the logger
 logger = logging.getLogger("metaTutor")
+
+# Trace output such as streaming progress is skipped when stdout is not a
+# terminal (e.g. piped to a log collector) unless METATUTOR_VERBOSE=1 is set
+VERBOSE = sys.stdout.isatty() or os.environ.get("METATUTOR_VERBOSE") == "1"